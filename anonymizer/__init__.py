@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 
-"""Python script containing the definitions of the classes Anonymizer and InitializationException."""
+"""Python script containing the definition of the class Anonymizer."""
 
 import json
-from anonymizer.operators import AnonymizationOperators
+import re
+from anonymizer.codec import get_codec
+from anonymizer.exceptions import InitializationException
+from anonymizer.instrumentation import AnonymizerStatistics, InstrumentedExecutionPlan
+from anonymizer.operators import DEFAULT_DATE_STR_CACHE_SIZE, AnonymizationOperators
+from anonymizer.plan import ALL_ELEMENTS_IN_ARRAY_NOTATION, ExecutionPlan
 
-
-class InitializationException(Exception):
-    """Raised for any Exception that do not allow the creation of the anonymizer instance."""
+# start of a JSON object or array encoded in UTF-8 (or ASCII): JSON encoded in UTF-16 or UTF-32 starts with a BOM or
+# has a NUL byte next to the first character
+_UTF8_JSON_START_REGEX = re.compile(rb"[ \t\n\r]*[{\[]")
 
 
 class Anonymizer:
@@ -20,6 +25,18 @@ class Anonymizer:
         Anonymize the json dictionary accordingly to the rules specified in the json-schema
     anonymize_json_str(target_json_str)
         Anonymize the json string accordingly to the rules specified in the json-schema
+    anonymize_json_bytes(payload)
+        Anonymize the serialized json accordingly to the rules specified in the json-schema, returning bytes
+    anonymize_json_str_to_str(target_json_str)
+        Anonymize the json string accordingly to the rules specified in the json-schema, returning a string
+    anonymize_many(target_jsons)
+        Anonymize the json dictionaries of a batch accordingly to the rules specified in the json-schema
+    anonymize_many_str(target_json_strs)
+        Anonymize the json strings of a batch accordingly to the rules specified in the json-schema
+    statistics_snapshot()
+        Return the counters and timings collected by the instrumentation
+    reload(json_schema, json_schema_str)
+        Compile a new json-schema and use it for the next anonymizations
 
     The json-schema of the field to be anonymized must have the additional attributes: x-anonymize-operation and
     x-anonymize-args, specifying the anonymization operation to apply and its args.
@@ -29,61 +46,12 @@ class Anonymizer:
     json_schema_str = None
     json_schema = None
     anonymization_operators = None
+    execution_plan = None
+    json_codec = None
+    # AnonymizerStatistics, None if the instrumentation is disabled
+    statistics = None
 
-    ALL_ELEMENTS_IN_ARRAY_NOTATION = "[*]"
-
-    def _apply_function_by_path(
-        self, current_json_subtree, path_chunks, target_function, function_args
-    ):
-        """
-        Recursive functions applying the target functions to the the fields matching the path in the JSON.
-
-        :param current_json_subtree:
-        :param path_chunks:
-        :param target_function:
-        :return: current_json_subtree with function applied on it
-        """
-        if not current_json_subtree:
-            # subtree is null or empty
-            # we can't proceed further
-            # since the element does not exist, return successfully
-            return True
-        if len(path_chunks) == 1:
-            # base case: we reached the end of the path - set the new value
-            if path_chunks[0] == self.ALL_ELEMENTS_IN_ARRAY_NOTATION and isinstance(
-                current_json_subtree, list
-            ):
-                # apply function to each element of the list
-                for i, list_item_value in enumerate(current_json_subtree):
-                    current_json_subtree[i] = target_function(
-                        list_item_value, *function_args
-                    )
-            else:
-                # apply function to the single item
-                if path_chunks[0] in current_json_subtree:
-                    current_value = current_json_subtree[path_chunks[0]]
-                    current_json_subtree[path_chunks[0]] = target_function(
-                        current_value, *function_args
-                    )
-            return True
-        else:
-            for k in path_chunks[:-1]:
-                if k == self.ALL_ELEMENTS_IN_ARRAY_NOTATION:
-                    for sub_json_item in current_json_subtree:
-                        self._apply_function_by_path(
-                            sub_json_item,
-                            path_chunks[1:],
-                            target_function,
-                            function_args,
-                        )
-                    return True
-                elif k in current_json_subtree:
-                    next_subtree = current_json_subtree[k]
-                    done = self._apply_function_by_path(
-                        next_subtree, path_chunks[1:], target_function, function_args
-                    )
-                    if done:
-                        return True
+    ALL_ELEMENTS_IN_ARRAY_NOTATION = ALL_ELEMENTS_IN_ARRAY_NOTATION
 
     def _find_fields_to_anonymize_from_schema(
         self, root: dict, traversed_path, fields_to_anonymize
@@ -149,7 +117,32 @@ class Anonymizer:
                     )
         return fields_to_anonymize
 
-    def __init__(self, json_schema=None, json_schema_str=None, encryption_secret=None):
+    def _may_contain_fields_to_anonymize(self, payload, markers, backslash):
+        """
+        Return False if the serialized json :payload certainly contains no field to anonymize, True otherwise.
+
+        :param payload: serialized json, str or bytes-like
+        :param markers: quoted top-level keys of the fields to anonymize, in the type of :payload
+        :param backslash: backslash in the type of :payload, keys could be escaped if :payload contains it
+        """
+        if markers is None or backslash in payload:
+            return True
+        for marker in markers:
+            if marker in payload:
+                return True
+        return False
+
+    def __init__(
+        self,
+        json_schema=None,
+        json_schema_str=None,
+        encryption_secret=None,
+        encryption_cache_size=None,
+        json_backend=None,
+        instrumentation=False,
+        instrumentation_hook=None,
+        date_str_cache_size=DEFAULT_DATE_STR_CACHE_SIZE,
+    ):
         """
         Create the Anonymizer with the specified schema.
 
@@ -159,25 +152,85 @@ class Anonymizer:
         :param json_schema: json-schema dictionary
         :param json_schema_str: json schema as string
         :param encryption_secret: secret used by the operation 'encrypt'
+        :param encryption_cache_size: max number of encrypted values to cache (LRU), disabled if None or 0
+        :param json_backend: JSON library used to parse and serialize the JSON: "orjson", "ujson" or "json",
+                             the first installed one if None
+        :param instrumentation: whether to collect the counters and timings of the rules and records, see
+                                statistics_snapshot
+        :param instrumentation_hook: function called after each anonymization with a dictionary containing the
+                                     number of "records" and the "parse_seconds", "traverse_seconds" and
+                                     "serialize_seconds" of the call; it enables the instrumentation
+        :param date_str_cache_size: max number of date strings whose truncate_day_from_str result is cached (LRU),
+                                    for each pattern; disabled if None or 0
         """
         if not json_schema and not json_schema_str:
             raise InitializationException(
                 "You need to specify the schema using json_schema or json_schema_str params"
             )
+        try:
+            self.json_codec = get_codec(json_backend)
+        except (ValueError, ImportError) as e:
+            raise InitializationException(
+                "Invalid JSON backend {!r}: {}".format(json_backend, e)
+            ) from e
 
-        if not json_schema:
-            self.json_schema_str = json_schema_str
-            self.json_schema = json.loads(json_schema_str)
-        else:
-            self.json_schema = json_schema
         self.anonymization_operators = AnonymizationOperators(
-            encryption_secret=encryption_secret
+            encryption_secret=encryption_secret,
+            encryption_cache_size=encryption_cache_size,
+            json_codec=self.json_codec,
+            date_str_cache_size=date_str_cache_size,
         )
+        if instrumentation or instrumentation_hook is not None:
+            self.statistics = AnonymizerStatistics(
+                hook=instrumentation_hook,
+                anonymization_operators=self.anonymization_operators,
+            )
+        self.reload(json_schema=json_schema, json_schema_str=json_schema_str)
+
+    def reload(self, json_schema=None, json_schema_str=None):
+        """
+        Compile a new json-schema and use it for the next anonymizations.
+
+        The json-schema is compiled in the calling thread, then the execution plan is swapped atomically: the
+        anonymizations running in other threads complete with the previous json-schema, without waiting.
+        If the json-schema is invalid, the previous one is kept.
+
+        :param json_schema: json-schema dictionary
+        :param json_schema_str: json schema as string
+        :raise InitializationException: if the json-schema is invalid
+        """
+        if not json_schema and not json_schema_str:
+            raise InitializationException(
+                "You need to specify the schema using json_schema or json_schema_str params"
+            )
+        if not json_schema:
+            try:
+                json_schema = json.loads(json_schema_str)
+            except ValueError as e:
+                raise InitializationException(
+                    "Invalid json-schema string: {}".format(e)
+                ) from e
 
         # passing empty lists for initializing the recursive function, default parameters mess up things
-        self.fields_to_anonymize = self._find_fields_to_anonymize_from_schema(
-            self.json_schema, [], []
+        fields_to_anonymize = self._find_fields_to_anonymize_from_schema(
+            json_schema, [], []
         )
+        # bind the operations once, unknown operations make the initialization fail
+        if self.statistics is not None:
+            execution_plan = InstrumentedExecutionPlan(
+                fields_to_anonymize, self.anonymization_operators
+            )
+            self.statistics.rules = execution_plan.rule_statistics
+        else:
+            execution_plan = ExecutionPlan(
+                fields_to_anonymize, self.anonymization_operators
+            )
+
+        self.json_schema_str = json_schema_str
+        self.json_schema = json_schema
+        self.fields_to_anonymize = fields_to_anonymize
+        # the entry points read the plan once per call, so that they use either the previous or the new one
+        self.execution_plan = execution_plan
 
     def anonymize_json(self, target_json):
         """
@@ -186,23 +239,11 @@ class Anonymizer:
         :param target_json: target json as dictionary
         :return: dictionary representing the anonymized json
         """
-        for field_to_anonymize in self.fields_to_anonymize:
-            # read path, and anonymization operation and args
-            path_chunks = field_to_anonymize["path"]
-            anonymization_operation_str = field_to_anonymize["operation"]
-            operation_args = field_to_anonymize.get("args")
-
-            # get anonymization operation
-            anonymization_operation = getattr(
-                self.anonymization_operators, anonymization_operation_str
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                target_json, None, self.execution_plan.apply, None
             )
-
-            # apply function to all the fields matching the path
-            self._apply_function_by_path(
-                target_json, path_chunks, anonymization_operation, operation_args
-            )
-
-        return target_json
+        return self.execution_plan.apply(target_json)
 
     def anonymize_json_str(self, target_json_str):
         """
@@ -211,5 +252,116 @@ class Anonymizer:
         :param target_json_str: target json as string
         :return: dictionary representing the anonymized json
         """
-        target_json = json.loads(target_json_str)
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                target_json_str, self.json_codec.loads, self.execution_plan.apply, None
+            )
+        target_json = self.json_codec.loads(target_json_str)
         return self.anonymize_json(target_json)
+
+    def anonymize_json_bytes(self, payload):
+        """
+        Anonymize the serialized json accordingly to the rules specified in the json-schema.
+
+        The payload is parsed and the anonymized json serialized with the JSON backend, without decoding the payload
+        to a string first. A UTF-8 bytes or bytearray payload that can not contain any field to anonymize (none of
+        the top-level keys of the json-schema rules appears in it) is returned as it is, without being parsed nor
+        validated. Payloads in other encodings (e.g. UTF-16) and memoryviews, which can not be searched without
+        being copied, are always parsed.
+
+        :param payload: target json as UTF-8 (or UTF-16/UTF-32) encoded bytes, bytearray or memoryview
+        :return: bytes of the anonymized json, UTF-8 encoded
+        """
+        execution_plan = self.execution_plan
+        if (
+            type(payload) is not memoryview
+            and b"\x00" not in payload
+            and _UTF8_JSON_START_REGEX.match(payload) is not None
+            and not self._may_contain_fields_to_anonymize(
+                payload, execution_plan.payload_byte_markers, b"\\"
+            )
+        ):
+            return bytes(payload)
+        json_codec = self.json_codec
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                payload, json_codec.loads, execution_plan.apply, json_codec.dumps
+            )
+        return json_codec.dumps(execution_plan.apply(json_codec.loads(payload)))
+
+    def anonymize_json_str_to_str(self, target_json_str):
+        """
+        Anonymize the json string accordingly to the rules specified in the json-schema.
+
+        A json string that can not contain any field to anonymize is returned as it is, see anonymize_json_bytes.
+
+        :param target_json_str: target json as string
+        :return: string of the anonymized json
+        """
+        execution_plan = self.execution_plan
+        if not self._may_contain_fields_to_anonymize(
+            target_json_str, execution_plan.payload_markers, "\\"
+        ):
+            return target_json_str
+        json_codec = self.json_codec
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                target_json_str,
+                json_codec.loads,
+                execution_plan.apply,
+                json_codec.dumps_str,
+            )
+        return json_codec.dumps_str(
+            execution_plan.apply(json_codec.loads(target_json_str))
+        )
+
+    def anonymize_many(self, target_jsons):
+        """
+        Anonymize the json dictionaries accordingly to the rules specified in the json-schema.
+
+        Operations having a batch variant (e.g. encrypt) are applied once to the values of the whole batch.
+
+        :param target_jsons: list or iterable of target jsons as dictionaries
+        :return: list of dictionaries representing the anonymized jsons, in the same order
+        """
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                target_jsons, list, self.execution_plan.apply_many, None, many=True
+            )
+        return self.execution_plan.apply_many(list(target_jsons))
+
+    def anonymize_many_str(self, target_json_strs):
+        """
+        Anonymize the json strings accordingly to the rules specified in the json-schema.
+
+        :param target_json_strs: list or iterable of target jsons as strings
+        :return: list of dictionaries representing the anonymized jsons, in the same order
+        """
+        loads = self.json_codec.loads
+        if self.statistics is not None:
+            return self.statistics.anonymize(
+                target_json_strs,
+                lambda target_json_strs: [
+                    loads(target_json_str) for target_json_str in target_json_strs
+                ],
+                self.execution_plan.apply_many,
+                None,
+                many=True,
+            )
+        return self.anonymize_many(
+            loads(target_json_str) for target_json_str in target_json_strs
+        )
+
+    def statistics_snapshot(self):
+        """
+        Return the counters and timings collected by the instrumentation.
+
+        :return: dictionary with the number of "records", the cumulative "parse_seconds", "traverse_seconds" and
+                 "serialize_seconds", and as "rules" the list of the counters of each rule: "path", "operation",
+                 "count", "total_seconds", "max_seconds", "null_count" and "skip_count", and as "operator_caches"
+                 the "hits" and "misses" of the caches of operator results by operator name.
+                 None if the instrumentation is disabled.
+        """
+        if self.statistics is None:
+            return None
+        return self.statistics.snapshot()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""Command line entry point anonymizing newline-delimited JSON (NDJSON) files: python -m anonymizer --help."""
+
+import argparse
+import contextlib
+import os
+import sys
+
+from anonymizer import Anonymizer
+from anonymizer.codec import JSON_BACKENDS
+from anonymizer.exceptions import (
+    InitializationException,
+    RecordException,
+    WorkerException,
+)
+from anonymizer.operators import DEFAULT_DATE_STR_CACHE_SIZE
+from anonymizer.parallel import ParallelAnonymizer
+from anonymizer.stream import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BUFFER_SIZE,
+    ON_ERROR_DEAD_LETTER,
+    ON_ERROR_FAIL,
+    ON_ERROR_POLICIES,
+    StreamStatistics,
+    anonymize_ndjson,
+)
+
+ENCRYPTION_SECRET_ENV_VARIABLE = "ANONYMIZER_ENCRYPTION_SECRET"
+
+
+def _positive_int(value):
+    """Return the integer of the command line :value, rejecting zero and negative integers."""
+    try:
+        integer = int(value)
+    except ValueError:
+        integer = None
+    if integer is None or integer < 1:
+        raise argparse.ArgumentTypeError(
+            "must be a positive integer, got {}".format(value)
+        )
+    return integer
+
+
+def _non_negative_int(value):
+    """Return the integer of the command line :value, rejecting negative integers."""
+    try:
+        integer = int(value)
+    except ValueError:
+        integer = None
+    if integer is None or integer < 0:
+        raise argparse.ArgumentTypeError(
+            "must be a non-negative integer, got {}".format(value)
+        )
+    return integer
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m anonymizer",
+        description="Anonymize newline-delimited JSON records with the rules of a json-schema.",
+    )
+    parser.add_argument("schema", help="path of the json-schema file")
+    parser.add_argument(
+        "-i", "--input", default="-", help="NDJSON file to anonymize (default: stdin)"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="file to write the anonymized NDJSON to (default: stdout)",
+    )
+    parser.add_argument(
+        "--encryption-secret",
+        default=os.environ.get(ENCRYPTION_SECRET_ENV_VARIABLE),
+        help="secret used by the encrypt operation (default: ${})".format(
+            ENCRYPTION_SECRET_ENV_VARIABLE
+        ),
+    )
+    parser.add_argument(
+        "--encryption-cache-size",
+        type=int,
+        default=0,
+        help="number of encrypted values to cache, useful when values repeat (default: 0, disabled)",
+    )
+    parser.add_argument(
+        "--date-str-cache-size",
+        type=_non_negative_int,
+        default=DEFAULT_DATE_STR_CACHE_SIZE,
+        help="number of date strings whose truncate_day_from_str result is cached, for each pattern "
+        "(default: {}, 0 disables it)".format(DEFAULT_DATE_STR_CACHE_SIZE),
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        help="JSON library used to parse and serialize the records (default: the fastest installed one)",
+    )
+    parser.add_argument(
+        "--on-error",
+        choices=ON_ERROR_POLICIES,
+        default=ON_ERROR_FAIL,
+        help="what to do with records that can not be anonymized (default: fail)",
+    )
+    parser.add_argument(
+        "--dead-letter-file",
+        help="file receiving the records that can not be anonymized, with --on-error dead-letter",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=_positive_int,
+        default=DEFAULT_BATCH_SIZE,
+        help="number of records anonymized together (default: {})".format(
+            DEFAULT_BATCH_SIZE
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=_non_negative_int,
+        default=1,
+        help="number of worker processes, 0 for one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="with multiple workers, write the records as soon as they are anonymized",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help="size in bytes of the read and write buffers (default: {})".format(
+            DEFAULT_BUFFER_SIZE
+        ),
+    )
+    args = parser.parse_args(argv)
+    if args.on_error == ON_ERROR_DEAD_LETTER and not args.dead_letter_file:
+        parser.error("--on-error dead-letter requires --dead-letter-file")
+    return args
+
+
+def _open(exit_stack, path, mode, buffer_size, std_stream):
+    """Open :path in binary :mode closing it with :exit_stack, or return the binary buffer of :std_stream for '-'."""
+    if path == "-":
+        return std_stream.buffer
+    return exit_stack.enter_context(open(path, mode, buffering=buffer_size))
+
+
+def main(argv=None):
+    """
+    Run the command line interface.
+
+    :param argv: command line arguments, sys.argv[1:] if None
+    :return: exit code
+    """
+    args = _parse_args(argv)
+    try:
+        with open(args.schema) as schema_file:
+            json_schema_str = schema_file.read()
+        anonymizer = Anonymizer(
+            json_schema_str=json_schema_str,
+            encryption_secret=args.encryption_secret,
+            encryption_cache_size=args.encryption_cache_size,
+            json_backend=args.json_backend,
+            date_str_cache_size=args.date_str_cache_size,
+        )
+    except (OSError, ValueError, InitializationException) as e:
+        print("Invalid schema {}: {}".format(args.schema, e), file=sys.stderr)
+        return 2
+
+    statistics = StreamStatistics()
+    try:
+        with contextlib.ExitStack() as exit_stack:
+            input_file = _open(
+                exit_stack, args.input, "rb", args.buffer_size, sys.stdin
+            )
+            output_file = _open(
+                exit_stack, args.output, "wb", args.buffer_size, sys.stdout
+            )
+            dead_letter_file = None
+            if args.dead_letter_file:
+                dead_letter_file = exit_stack.enter_context(
+                    open(args.dead_letter_file, "wb")
+                )
+            if args.workers == 1:
+                anonymized_lines = anonymize_ndjson(
+                    anonymizer,
+                    input_file,
+                    batch_size=args.batch_size,
+                    on_error=args.on_error,
+                    dead_letter_file=dead_letter_file,
+                    statistics=statistics,
+                )
+            else:
+                # entered after the files, so that the workers are stopped before closing them
+                parallel_anonymizer = exit_stack.enter_context(
+                    ParallelAnonymizer(
+                        json_schema_str=json_schema_str,
+                        encryption_secret=args.encryption_secret,
+                        encryption_cache_size=args.encryption_cache_size,
+                        json_backend=args.json_backend,
+                        workers=args.workers or None,
+                        chunk_size=args.batch_size,
+                        ordered=not args.unordered,
+                        date_str_cache_size=args.date_str_cache_size,
+                    )
+                )
+                anonymized_lines = parallel_anonymizer.anonymize_ndjson(
+                    input_file,
+                    on_error=args.on_error,
+                    dead_letter_file=dead_letter_file,
+                    statistics=statistics,
+                )
+            output_file.writelines(anonymized_lines)
+            output_file.flush()
+    except RecordException as e:
+        print("Anonymization failed at {}".format(e), file=sys.stderr)
+        return 1
+    except WorkerException as e:
+        print("Anonymization failed: {}".format(e), file=sys.stderr)
+        return 1
+    except OSError as e:
+        print("Input/output error: {}".format(e), file=sys.stderr)
+        return 2
+
+    print(
+        "Anonymized {} records ({} failed) in {:.2f}s: {:.0f} records/sec".format(
+            statistics.records_written,
+            statistics.records_failed,
+            statistics.elapsed_seconds,
+            statistics.records_per_second,
+        ),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the JSON codecs used to parse and serialize the anonymized JSON."""
+
+import json
+import math
+
+JSON_BACKEND_STDLIB = "json"
+JSON_BACKEND_ORJSON = "orjson"
+JSON_BACKEND_UJSON = "ujson"
+# backends in order of preference, the first installed one is the default
+JSON_BACKENDS = (JSON_BACKEND_ORJSON, JSON_BACKEND_UJSON, JSON_BACKEND_STDLIB)
+
+
+class JsonCodec:
+    """
+    JsonCodec parses and serializes JSON with a given backend.
+
+    The fast backends fall back to the json module for the inputs they reject (e.g. NaN or integers larger than 64
+    bits) and for the objects they would serialize differently (e.g. NaN and Infinity, written as null by orjson),
+    so that every backend accepts and writes the same JSON.
+
+    Attributes
+    ----------
+    name : str
+        name of the backend
+    loads : callable
+        parse JSON from str, bytes, bytearray or memoryview
+    dumps : callable
+        serialize a JSON object to UTF-8 encoded bytes
+    dumps_str : callable
+        serialize a JSON object to str
+    """
+
+    __slots__ = ("name", "loads", "dumps", "dumps_str")
+
+    def __init__(self, name, loads, dumps, dumps_str):
+        """
+        Create the JsonCodec.
+
+        :param name: name of the backend
+        :param loads: function parsing JSON from str, bytes, bytearray or memoryview
+        :param dumps: function serializing a JSON object to UTF-8 encoded bytes
+        :param dumps_str: function serializing a JSON object to str
+        """
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.dumps_str = dumps_str
+
+
+def _stdlib_loads(data):
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj).encode("utf-8")
+
+
+def _has_non_finite_float(obj):
+    # iterative, deeply nested JSON must not hit the recursion limit
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not math.isfinite(obj):
+                return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return False
+
+
+def _stdlib_codec():
+    return JsonCodec(JSON_BACKEND_STDLIB, _stdlib_loads, _stdlib_dumps, json.dumps)
+
+
+def _orjson_codec():
+    import orjson
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return _stdlib_loads(data)
+
+    def dumps(obj):
+        try:
+            data = orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            return _stdlib_dumps(obj)
+        # orjson writes NaN and Infinity as null, the json module writes them as they are parsed
+        if b"null" in data and _has_non_finite_float(obj):
+            return _stdlib_dumps(obj)
+        return data
+
+    def dumps_str(obj):
+        return dumps(obj).decode("utf-8")
+
+    return JsonCodec(JSON_BACKEND_ORJSON, loads, dumps, dumps_str)
+
+
+def _ujson_codec():
+    import ujson
+
+    def loads(data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    def dumps_str(obj):
+        try:
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        except (TypeError, OverflowError):
+            return json.dumps(obj)
+
+    def dumps(obj):
+        return dumps_str(obj).encode("utf-8")
+
+    return JsonCodec(JSON_BACKEND_UJSON, loads, dumps, dumps_str)
+
+
+_CODEC_FACTORIES = {
+    JSON_BACKEND_STDLIB: _stdlib_codec,
+    JSON_BACKEND_ORJSON: _orjson_codec,
+    JSON_BACKEND_UJSON: _ujson_codec,
+}
+
+# codecs already created, by backend name
+_codecs = {}
+# name of the default backend, chosen on first use
+_default_backend = None
+
+
+def default_json_backend():
+    """
+    Return the name of the default JSON backend: the first installed one of JSON_BACKENDS.
+
+    :return: name of the backend
+    """
+    global _default_backend
+    if _default_backend is None:
+        for backend in JSON_BACKENDS:
+            try:
+                get_codec(backend)
+            except ImportError:
+                continue
+            _default_backend = backend
+            break
+    return _default_backend
+
+
+def get_codec(backend=None):
+    """
+    Return the JsonCodec of :backend.
+
+    The backend module is imported on first use.
+
+    :param backend: name of the backend, one of JSON_BACKENDS, the default backend if None
+    :return: JsonCodec
+    :raise ValueError: if :backend is unknown
+    :raise ImportError: if the module of :backend is not installed
+    """
+    if backend is None:
+        backend = default_json_backend()
+    codec = _codecs.get(backend)
+    if codec is None:
+        codec_factory = _CODEC_FACTORIES.get(backend)
+        if codec_factory is None:
+            raise ValueError(
+                "Unknown JSON backend {!r}, must be one of {}".format(
+                    backend, JSON_BACKENDS
+                )
+            )
+        codec = _codecs[backend] = codec_factory()
+    return codec
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definitions of the classes ConditionalOperation, Condition and FieldPath."""
+
+import operator
+
+# returned instead of a key when a path chunk does not exist
+_MISSING = object()
+
+
+def _contains(a, b):
+    """
+    Check if a is in b
+    :param a: value to search in b
+    :param b: any data type an "in" operator can be applied on (e.g. list, tuple, string)
+    :return: boolean, whether a is in b or not
+    """
+    return operator.contains(b, a)
+
+
+def _not_contains(a, b):
+    """
+    Check if a is not in b
+    :param a: value to search in b
+    :param b: any data type an "in" operator can be applied on (e.g. list, tuple, string)
+    :return: boolean, if a is in b -> False, True otherwise
+    """
+    return not operator.contains(b, a)
+
+
+OPERATOR_SYMBOL_FUNCTION_MAP = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "and": operator.and_,
+    "or": operator.or_,
+    "in": _contains,
+    "not in": _not_contains,
+}
+
+
+def _ensure_type_list(co):
+    """
+    Convert input into a list, e.g. "123" -> ["123], ["123", "234"] -> ["123", "234"]
+    :return: list
+    """
+    if not isinstance(co, list):
+        return [co]
+    return co
+
+
+def _operator_function(symbol):
+    """Return the function of the operator :symbol, raise ValueError if unknown."""
+    try:
+        return OPERATOR_SYMBOL_FUNCTION_MAP[symbol]
+    except (KeyError, TypeError):
+        raise ValueError("unknown conditional operator {!r}".format(symbol))
+
+
+def _lookup_key(container, path_chunk):
+    """
+    Return the key of :container matching :path_chunk: the chunk itself for a dictionary, its integer value for a list.
+
+    :return: key or index of :container, _MISSING if :container has none matching :path_chunk
+    """
+    if isinstance(container, dict):
+        return path_chunk if path_chunk in container else _MISSING
+    if isinstance(container, list):
+        try:
+            index = int(path_chunk)
+        except ValueError:
+            return _MISSING
+        return index if -len(container) <= index < len(container) else _MISSING
+    return _MISSING
+
+
+class FieldPath:
+    """
+    FieldPath resolves a dotted path (e.g. "attributes.member_count") inside a dictionary.
+
+    List elements can be addressed with their index (e.g. "images.0.url").
+
+    Attributes
+    ----------
+    field : str
+        dotted path
+    parent_chunks : tuple
+        chunks of the path leading to the container of the field
+    last_chunk : str
+        last chunk of the path, the key of the field in its container
+    """
+
+    __slots__ = ("field", "parent_chunks", "last_chunk")
+
+    def __init__(self, field):
+        """
+        Split the dotted path :field.
+
+        :param field: dotted path
+        """
+        self.field = field
+        chunks = field.split(".")
+        self.parent_chunks = tuple(chunks[:-1])
+        self.last_chunk = chunks[-1]
+
+    def locate(self, field_dict):
+        """
+        Walk the path inside :field_dict.
+
+        :return: tuple (container of the field, key of the field in the container), the key is _MISSING if the path
+                 does not exist
+        """
+        container = field_dict
+        for path_chunk in self.parent_chunks:
+            key = _lookup_key(container, path_chunk)
+            if key is _MISSING:
+                return None, _MISSING
+            container = container[key]
+        return container, _lookup_key(container, self.last_chunk)
+
+    def get(self, field_dict):
+        """
+        Return the value of the field in :field_dict.
+
+        :raise KeyError: if the path does not exist
+        """
+        container, key = self.locate(field_dict)
+        if key is _MISSING:
+            raise KeyError(self.field)
+        return container[key]
+
+
+class Condition:
+    """
+    Condition compares the value of a field of a dictionary with a constant value.
+
+    Attributes
+    ----------
+    path : FieldPath
+        path of the field to compare
+    operator_function : callable
+        comparison function, taking the field value and :value
+    value : object
+        value to compare the field value with
+    value_when_null : object
+        value used in place of the field value when it is null
+    """
+
+    __slots__ = ("path", "operator_function", "value", "value_when_null")
+
+    def __init__(self, field, operator_symbol, value, value_when_null):
+        """
+        Create the Condition.
+
+        :param field: dotted path of the field to compare, e.g. "attributes.member_count"
+        :param operator_symbol: symbol of the comparison operator, e.g. "<"
+        :param value: value to compare the field value with
+        :param value_when_null: value used in place of the field value when it is null
+        """
+        self.path = FieldPath(field)
+        self.operator_function = _operator_function(operator_symbol)
+        self.value = value
+        self.value_when_null = value_when_null
+
+    def evaluate(self, field_dict):
+        """
+        Evaluate the condition on :field_dict.
+
+        :return: boolean
+        :raise KeyError: if the field does not exist in :field_dict
+        """
+        value = self.path.get(field_dict)
+        if value is None:
+            return self.operator_function(self.value_when_null, self.value)
+        return self.operator_function(value, self.value)
+
+
+class ConditionalOperation:
+    """
+    ConditionalOperation is the compiled form of a dictionary of conditional args of conditional_operation.
+
+    Attributes
+    ----------
+    target_path : FieldPath
+        path of the field to anonymize if the conditions are met
+    conditions : tuple
+        Condition to evaluate
+    boolean_function : callable
+        function combining the results of the conditions
+    function : callable
+        bound anonymization operator applied to the target field
+    function_args : tuple
+        additional arguments of :function
+    """
+
+    __slots__ = (
+        "target_path",
+        "conditions",
+        "boolean_function",
+        "function",
+        "function_args",
+    )
+
+    def __init__(self, conditional_args_dict, anonymization_operators):
+        """
+        Compile the conditional args.
+
+        :param conditional_args_dict: dictionary containing the conditional arguments, see conditional_operation
+        :param anonymization_operators: AnonymizationOperators the function is bound to
+        :raise ValueError: if the conditional arguments are missing or not valid
+        """
+        try:
+            target_field = conditional_args_dict["target_field"]
+            function = conditional_args_dict["function"]
+            conditional_field_values_when_null = _ensure_type_list(
+                conditional_args_dict["conditional_field_values_when_null"]
+            )
+            conditional_operators = _ensure_type_list(
+                conditional_args_dict["conditional_operators"]
+            )
+            conditional_fields = _ensure_type_list(
+                conditional_args_dict["conditional_fields"]
+            )
+            conditional_values = _ensure_type_list(
+                conditional_args_dict["conditional_values"]
+            )
+        except KeyError as e:
+            raise ValueError("missing conditional argument {}".format(e))
+        # check if all necessary information was provided
+        if (
+            not len(conditional_field_values_when_null)
+            == len(conditional_operators)
+            == len(conditional_fields)
+            == len(conditional_values)
+        ):
+            raise ValueError(
+                "Provided conditional argument lists are different in length!"
+            )
+        self.target_path = FieldPath(target_field)
+        self.conditions = tuple(
+            Condition(field, operator_symbol, value, value_when_null)
+            for operator_symbol, field, value, value_when_null in zip(
+                conditional_operators,
+                conditional_fields,
+                conditional_values,
+                conditional_field_values_when_null,
+            )
+        )
+        self.boolean_function = _operator_function(
+            conditional_args_dict.get("conditional_boolean_function", "and")
+        )
+        self.function = None
+        if isinstance(function, str) and not function.startswith("_"):
+            self.function = getattr(anonymization_operators, function, None)
+        if not callable(self.function):
+            raise ValueError("unknown anonymization operation {!r}".format(function))
+        self.function_args = tuple(
+            anonymization_operators.compile_args(
+                function, conditional_args_dict.get("function_args", [])
+            )
+        )
+
+    def apply(self, field_dict):
+        """
+        Anonymize the target field of :field_dict in place, if the conditions are met.
+
+        :param field_dict: dictionary containing the target field
+        """
+        # Check if the `target_field` path exists in the `field_dict`. In the previous versions we only checked if
+        # the final attribute in the path exists. However, for some messages (e.g. sport_activity) it can happen
+        # that a full object is missing. For example, the 'source_content' object in attributes.source_content.id
+        # can be missing. In case the path is not valid, the operation will be skipped. This also means that typos
+        # in `target_field` are ignored and no error is raised!
+        container, key = self.target_path.locate(field_dict)
+        if key is _MISSING:
+            return
+
+        cond_result = None
+        for condition in self.conditions:
+            res = condition.evaluate(field_dict)
+            if cond_result is None:
+                cond_result = res
+            else:
+                cond_result = self.boolean_function(cond_result, res)
+        if cond_result:
+            function = self.function
+            function_args = self.function_args
+            if isinstance(container[key], list):
+                container[key] = [function(v, *function_args) for v in container[key]]
+            else:
+                container[key] = function(container[key], *function_args)
+
+
+def compile_conditional_operations(conditional_args, anonymization_operators):
+    """
+    Compile the conditional args of conditional_operation.
+
+    :param conditional_args: dictionary or list of dictionaries containing the conditional arguments
+    :param anonymization_operators: AnonymizationOperators the functions are bound to
+    :return: tuple of ConditionalOperation
+    :raise ValueError: if the conditional arguments are missing or not valid
+    """
+    if type(conditional_args) is not list:
+        conditional_args = [conditional_args]
+    return tuple(
+        ConditionalOperation(conditional_args_dict, anonymization_operators)
+        for conditional_args_dict in conditional_args
+    )
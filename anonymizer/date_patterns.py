@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the date patterns compiled to truncate date strings quickly."""
+
+import functools
+import re
+
+# regexes of the directives in time.strptime (_strptime.TimeRE), so that the same strings are accepted
+_DIRECTIVE_REGEXES = {
+    "Y": r"(?P<Y>\d\d\d\d)",
+    "m": r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    "d": r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])",
+    "H": r"(?P<H>2[0-3]|[0-1]\d|\d)",
+    "M": r"(?P<M>[0-5]\d|\d)",
+    "S": r"(?P<S>6[0-1]|[0-5]\d|\d)",
+    "f": r"(?P<f>[0-9]{1,6})",
+}
+# output of the directives for the truncated date, the year and month are filled by str.format
+_DIRECTIVE_OUTPUTS = {
+    "Y": "{0:04}",
+    "m": "{1:02}",
+    "d": "01",
+    "H": "00",
+    "M": "00",
+    "S": "00",
+    "f": "000000",
+}
+# directives a pattern must contain to be compiled, patterns without them have defaults handled by strptime only
+_REQUIRED_DIRECTIVES = frozenset("Ymd")
+_PATTERN_TOKEN_REGEX = re.compile(r"%(.)|(\s+)|([^%\s])", re.DOTALL)
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month]
+
+
+class DatePattern:
+    """
+    DatePattern truncates the date strings of a strptime pattern made of numeric directives, without strptime.
+
+    Patterns like "%Y-%m-%d", "%Y-%m-%dT%H:%M:%SZ" or "%Y-%m-%d %H:%M:%S.%f" are compiled once into a regex, built
+    like strptime builds it, and into the format of the truncated date: the day is set to 01 and the time to zero
+    without parsing the date into a datetime. The dates accepted and the strings returned are the same as with
+    strptime and strftime, see AnonymizationOperators.truncate_day_from_str.
+
+    Attributes
+    ----------
+    pattern : str
+        strptime pattern the DatePattern is compiled from
+
+    Methods
+    -------
+    truncate_day(date_str)
+        Return :date_str with its day set to first of the month and the time part zeroed
+    """
+
+    __slots__ = ("pattern", "regex", "output_format", "mismatch")
+
+    def __init__(self, pattern, regex, output_format):
+        """
+        Create the DatePattern, see compile_date_pattern.
+
+        :param pattern: strptime pattern
+        :param regex: compiled regex matching the date strings of :pattern
+        :param output_format: str.format format of the truncated date, taking the year and the month
+        """
+        self.pattern = pattern
+        self.regex = regex
+        self.output_format = output_format
+        self.mismatch = "input_does_not_match_pattern: {}".format(pattern)
+
+    def __repr__(self):
+        return "DatePattern({!r})".format(self.pattern)
+
+    def __str__(self):
+        return self.pattern
+
+    def truncate_day(self, date_str):
+        """
+        Return :date_str with its day set to first of the month and the time part zeroed.
+
+        :return: string following the pattern, "input_does_not_match_pattern: <pattern>" if :date_str does not
+                 match it, None if :date_str is empty, white-spaces, null or not a string
+        """
+        if type(date_str) is not str or not date_str.strip():
+            return None
+        match = self.regex.match(date_str)
+        if match is None or match.end() != len(date_str):
+            return self.mismatch
+        year = int(match.group("Y"))
+        month = int(match.group("m"))
+        if year < 1 or int(match.group("d")) > _days_in_month(year, month):
+            return self.mismatch
+        if "S" in self.regex.groupindex and int(match.group("S")) > 59:
+            # leap seconds are matched by strptime but rejected by datetime
+            return self.mismatch
+        return self.output_format.format(year, month)
+
+
+def compile_date_pattern(pattern):
+    """
+    Compile the strptime :pattern into a DatePattern.
+
+    :param pattern: strptime pattern, e.g. "%Y-%m-%d"
+    :return: DatePattern, None if :pattern has other directives than %Y, %m, %d, %H, %M, %S and %f, repeats one
+             or lacks %Y, %m or %d: such patterns are handled by strptime
+    """
+    if not isinstance(pattern, str):
+        return None
+    regex_parts = []
+    output_parts = []
+    directives = set()
+    end = 0
+    for token in _PATTERN_TOKEN_REGEX.finditer(pattern):
+        if token.start() != end:
+            # a "%" at the end of the pattern
+            return None
+        end = token.end()
+        directive, whitespaces, literal = token.groups()
+        if directive is not None:
+            if directive not in _DIRECTIVE_REGEXES or directive in directives:
+                return None
+            directives.add(directive)
+            regex_parts.append(_DIRECTIVE_REGEXES[directive])
+            output_parts.append(_DIRECTIVE_OUTPUTS[directive])
+        elif whitespaces is not None:
+            # strptime matches any whitespace in the pattern with one or more whitespace characters
+            regex_parts.append(r"\s+")
+            output_parts.append(whitespaces)
+        else:
+            regex_parts.append(re.escape(literal))
+            output_parts.append(literal.replace("{", "{{").replace("}", "}}"))
+    if end != len(pattern) or not _REQUIRED_DIRECTIVES <= directives:
+        return None
+    return DatePattern(
+        pattern,
+        re.compile("".join(regex_parts), re.IGNORECASE),
+        "".join(output_parts),
+    )
+
+
+class DateStrMemo:
+    """
+    DateStrMemo caches the truncated date strings of a pattern, in a LRU cache bounded by :max_size.
+
+    Birthdays and registration dates repeat across the records, so the same date strings are truncated again and
+    again. The results are cached whatever they are, so the date strings not matching the pattern are cheap too.
+
+    Attributes
+    ----------
+    pattern : str
+        strptime pattern of the date strings
+
+    Methods
+    -------
+    truncate_day(date_str)
+        Return the truncated :date_str, from the cache if possible
+    info()
+        Return the counters of the cache
+    reset_counters()
+        Reset the hits and misses, keeping the cached results
+    """
+
+    __slots__ = ("pattern", "_cached_truncate_day", "_truncate_day", "_counters_offset")
+
+    def __init__(self, pattern, truncate_day, max_size):
+        """
+        Create the empty DateStrMemo.
+
+        :param pattern: strptime pattern of the date strings
+        :param truncate_day: function truncating a date string of :pattern
+        :param max_size: max number of cached date strings
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive, got {}".format(max_size))
+        self.pattern = pattern
+        self._truncate_day = truncate_day
+        self._cached_truncate_day = functools.lru_cache(maxsize=max_size)(truncate_day)
+        # hits and misses at the last reset_counters, functools caches can not reset them without being cleared
+        self._counters_offset = (0, 0)
+
+    def __repr__(self):
+        return "DateStrMemo({!r})".format(self.pattern)
+
+    def __str__(self):
+        return self.pattern
+
+    def truncate_day(self, date_str):
+        """
+        Return the truncated :date_str, from the cache if possible.
+
+        :return: see AnonymizationOperators.truncate_day_from_str
+        """
+        if type(date_str) is not str:
+            # None and other values are not cached, they may not even be hashable
+            return self._truncate_day(date_str)
+        return self._cached_truncate_day(date_str)
+
+    def info(self):
+        """
+        Return the counters of the cache.
+
+        :return: dictionary with the number of "hits" and "misses", the max "size" and the number of "cached" date
+                 strings
+        """
+        cache_info = self._cached_truncate_day.cache_info()
+        return {
+            "hits": cache_info.hits - self._counters_offset[0],
+            "misses": cache_info.misses - self._counters_offset[1],
+            "size": cache_info.maxsize,
+            "cached": cache_info.currsize,
+        }
+
+    def reset_counters(self):
+        """Reset the hits and misses, keeping the cached results."""
+        cache_info = self._cached_truncate_day.cache_info()
+        self._counters_offset = (cache_info.hits, cache_info.misses)
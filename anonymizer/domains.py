@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definition of the class TestDomains."""
+
+# key marking the end of a test domain in the nodes of the trie, it can not be a label
+_END_OF_DOMAIN = None
+
+
+class TestDomains:
+    """
+    TestDomains is the set of the test email domains of is_email_present_or_test, normalized once.
+
+    The domains are lowercased and stripped into a frozenset, so that checking a domain takes constant time whatever
+    the number of test domains. With :match_subdomains the subdomains of the test domains match as well (e.g.
+    "qa.example.com" for "example.com"): the domains are stored in a trie of their labels from the last one, and
+    checking a domain takes a lookup per label.
+
+    Attributes
+    ----------
+    domains : frozenset
+        normalized test domains
+    match_subdomains : bool
+        whether the subdomains of the test domains match
+
+    Methods
+    -------
+    __contains__(domain)
+        Return whether the normalized :domain is a test domain (or one of their subdomains)
+    """
+
+    __test__ = False  # not a test case, despite its name
+    __slots__ = ("domains", "match_subdomains", "_labels_trie")
+
+    def __init__(self, test_domains, match_subdomains=False):
+        """
+        Normalize the :test_domains.
+
+        :param test_domains: iterable of test domains, e.g. ["example.com", "Test.com"]
+        :param match_subdomains: whether the subdomains of the test domains match as well
+        :raise ValueError: if a test domain is not a string
+        """
+        domains = set()
+        for test_domain in test_domains:
+            if not isinstance(test_domain, str):
+                raise ValueError(
+                    "test domains must be strings, got {!r}".format(test_domain)
+                )
+            domains.add(test_domain.lower().strip())
+        self.domains = frozenset(domains)
+        self.match_subdomains = bool(match_subdomains)
+        self._labels_trie = None
+        if self.match_subdomains:
+            self._labels_trie = {}
+            for domain in self.domains:
+                node = self._labels_trie
+                for label in reversed(domain.split(".")):
+                    node = node.setdefault(label, {})
+                node[_END_OF_DOMAIN] = True
+
+    def __repr__(self):
+        return "TestDomains({!r}, match_subdomains={!r})".format(
+            sorted(self.domains), self.match_subdomains
+        )
+
+    def __contains__(self, domain):
+        """
+        Return whether :domain is a test domain, or a subdomain of one of them if match_subdomains is set.
+
+        :param domain: lowercased and stripped domain
+        """
+        if domain in self.domains:
+            return True
+        if self._labels_trie is None:
+            return False
+        node = self._labels_trie
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END_OF_DOMAIN in node:
+                return True
+        return False
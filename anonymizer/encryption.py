@@ -21,6 +21,9 @@ class SymmetricEncryption(object):
         """
         self.bs = AES.block_size
         self.key = hashlib.sha256(key.encode()).digest()
+        # ECB has no IV and no state between calls: the cipher (and its key schedule) is created once and can be
+        # shared by encrypt and decrypt, also across threads
+        self.cipher = AES.new(self.key, AES.MODE_ECB)
 
     def encrypt(self, raw: str) -> str:
         """
@@ -30,8 +33,27 @@ class SymmetricEncryption(object):
         :return: encoding base64 of the encrypted string
         """
         raw = pad(raw.encode("utf-8"), 16, style="pkcs7")
-        cipher = AES.new(self.key, AES.MODE_ECB)
-        return base64.b64encode(cipher.encrypt(raw)).decode("utf-8")
+        return base64.b64encode(self.cipher.encrypt(raw)).decode("utf-8")
+
+    def encrypt_many(self, raws) -> list:
+        """
+        Encrypt a list of strings with a single call to the cipher.
+
+        ECB encrypts each block independently, so encrypting the concatenation of the padded strings and slicing the
+        result gives the same output as encrypting each string separately.
+
+        :param raws: list of strings to encrypt
+        :return: list of the base64 encodings of the encrypted strings
+        """
+        padded_raws = [pad(raw.encode("utf-8"), 16, style="pkcs7") for raw in raws]
+        encrypted = memoryview(self.cipher.encrypt(b"".join(padded_raws)))
+        encs = []
+        start = 0
+        for padded_raw in padded_raws:
+            end = start + len(padded_raw)
+            encs.append(base64.b64encode(encrypted[start:end]).decode("utf-8"))
+            start = end
+        return encs
 
     def decrypt(self, enc: str) -> str:
         """
@@ -41,5 +63,21 @@ class SymmetricEncryption(object):
         :return: decrypted string
         """
         enc = base64.b64decode(enc)
-        cipher = AES.new(self.key, AES.MODE_ECB)
-        return unpad(cipher.decrypt(enc), 16, style="pkcs7").decode("utf-8")
+        return unpad(self.cipher.decrypt(enc), 16, style="pkcs7").decode("utf-8")
+
+    def decrypt_many(self, encs) -> list:
+        """
+        Decrypt a list of strings with a single call to the cipher.
+
+        :param encs: list of base64 encodings of encrypted strings
+        :return: list of decrypted strings
+        """
+        decoded_encs = [base64.b64decode(enc) for enc in encs]
+        decrypted = self.cipher.decrypt(b"".join(decoded_encs))
+        raws = []
+        start = 0
+        for decoded_enc in decoded_encs:
+            end = start + len(decoded_enc)
+            raws.append(unpad(decrypted[start:end], 16, style="pkcs7").decode("utf-8"))
+            start = end
+        return raws
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definitions of the exceptions raised by the anonymizer."""
+
+
+class InitializationException(Exception):
+    """Raised for any Exception that do not allow the creation of the anonymizer instance."""
+
+
+class RecordException(Exception):
+    """Raised when a record of a stream can not be anonymized."""
+
+    def __init__(self, line_number, message):
+        """
+        Create the RecordException.
+
+        :param line_number: line number (starting from 1) of the record in the stream
+        :param message: description of the error
+        """
+        super().__init__("line {}: {}".format(line_number, message))
+        self.line_number = line_number
+
+
+class WorkerException(Exception):
+    """Raised when a worker process of a ParallelAnonymizer stops unexpectedly, losing the records sent to it."""
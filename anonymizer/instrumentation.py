@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definitions of the classes measuring where the anonymization time goes."""
+
+import collections
+import time
+
+from anonymizer.plan import ExecutionPlan
+
+
+class RuleStatistics:
+    """
+    RuleStatistics collects the counters of an AnonymizationRule.
+
+    Attributes
+    ----------
+    path : tuple
+        path chunks of the field anonymized by the rule
+    operation : str
+        name of the anonymization operation
+    count : int
+        number of field values anonymized
+    total_seconds : float
+        cumulative time spent in the operator
+    max_seconds : float
+        longest call of the operator (a call of the batch variant counts as one call)
+    null_count : int
+        number of null field values
+    skip_count : int
+        number of records without any field matched by the rule
+    """
+
+    __slots__ = (
+        "path",
+        "operation",
+        "count",
+        "total_seconds",
+        "max_seconds",
+        "null_count",
+        "skip_count",
+    )
+
+    def __init__(self, path, operation):
+        """
+        Create the RuleStatistics, with all the counters set to zero.
+
+        :param path: path chunks of the field anonymized by the rule
+        :param operation: name of the anonymization operation
+        """
+        self.path = tuple(path)
+        self.operation = operation
+        self.reset()
+
+    def reset(self):
+        """Set all the counters to zero."""
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.null_count = 0
+        self.skip_count = 0
+
+    def add_call(self, seconds, count, null_count):
+        """Account a call of the operator on :count field values, :null_count of them being null."""
+        self.count += count
+        self.null_count += null_count
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def as_dict(self):
+        """
+        Return the counters as dictionary.
+
+        :return: dictionary with the path (chunks joined by "/") and operation of the rule and its counters
+        """
+        return {
+            "path": "/".join(self.path),
+            "operation": self.operation,
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds,
+            "null_count": self.null_count,
+            "skip_count": self.skip_count,
+        }
+
+
+class AnonymizerStatistics:
+    """
+    AnonymizerStatistics collects the counters of the rules and the timings of the records of an Anonymizer.
+
+    The counters are not synchronized: when the Anonymizer is shared across threads they are approximate.
+
+    Methods
+    -------
+    anonymize(target, parse, anonymize, serialize, many)
+        Run the steps of the anonymization of :target, measuring the time of each one
+    snapshot()
+        Return a copy of the counters as dictionary
+    reset()
+        Set all the counters to zero
+
+    Attributes
+    ----------
+    rules : list
+        RuleStatistics of each rule of the execution plan
+    anonymization_operators : AnonymizationOperators
+        operators whose caches of results are part of the snapshot, None if not set
+    records : int
+        number of anonymized records
+    parse_seconds : float
+        cumulative time spent parsing the records
+    traverse_seconds : float
+        cumulative time spent traversing the records and applying the rules
+    serialize_seconds : float
+        cumulative time spent serializing the anonymized records
+    hook : callable
+        function called after each anonymization with the dictionary of its timings, None if not set
+    """
+
+    def __init__(self, hook=None, anonymization_operators=None):
+        """
+        Create the AnonymizerStatistics.
+
+        :param hook: function called after each anonymization with a dictionary containing the number of
+                     "records" and the "parse_seconds", "traverse_seconds" and "serialize_seconds" of the call
+        :param anonymization_operators: AnonymizationOperators whose caches of results are part of the snapshot,
+                                        read on each snapshot and reset as they are created with the json-schema
+        """
+        self.rules = []
+        self.anonymization_operators = anonymization_operators
+        self.hook = hook
+        self.reset()
+
+    def reset(self):
+        """Set all the counters to zero."""
+        self.records = 0
+        self.parse_seconds = 0.0
+        self.traverse_seconds = 0.0
+        self.serialize_seconds = 0.0
+        for rule_statistics in self.rules:
+            rule_statistics.reset()
+        if self.anonymization_operators is not None:
+            for cache in self.anonymization_operators.operator_caches.values():
+                cache.reset_counters()
+
+    def anonymize(self, target, parse, anonymize, serialize, many=False):
+        """
+        Run the steps of the anonymization of :target, measuring the time of each one.
+
+        :param target: record (or list of records if :many) to anonymize
+        :param parse: function parsing :target, None if :target is already parsed
+        :param anonymize: function anonymizing the parsed :target
+        :param serialize: function serializing the anonymized :target, None to return it as it is
+        :param many: whether :target is a list of records
+        :return: the anonymized :target
+        """
+        perf_counter = time.perf_counter
+        start = perf_counter()
+        parsed = start
+        if parse is not None:
+            target = parse(target)
+            parsed = perf_counter()
+        target = anonymize(target)
+        traversed = perf_counter()
+        records = len(target) if many else 1
+        serialized = traversed
+        if serialize is not None:
+            target = serialize(target)
+            serialized = perf_counter()
+
+        self.records += records
+        self.parse_seconds += parsed - start
+        self.traverse_seconds += traversed - parsed
+        self.serialize_seconds += serialized - traversed
+        if self.hook is not None:
+            self.hook(
+                {
+                    "records": records,
+                    "parse_seconds": parsed - start,
+                    "traverse_seconds": traversed - parsed,
+                    "serialize_seconds": serialized - traversed,
+                }
+            )
+        return target
+
+    def snapshot(self):
+        """
+        Return a copy of the counters as dictionary.
+
+        :return: dictionary with the number of "records", the cumulative "parse_seconds", "traverse_seconds" and
+                 "serialize_seconds", the list of the counters of each rule as "rules", see RuleStatistics, and the
+                 counters of the caches of operator results by operator name as "operator_caches"
+        """
+        operator_caches = {}
+        if self.anonymization_operators is not None:
+            operator_caches = self.anonymization_operators.operator_cache_info()
+        return {
+            "records": self.records,
+            "parse_seconds": self.parse_seconds,
+            "traverse_seconds": self.traverse_seconds,
+            "serialize_seconds": self.serialize_seconds,
+            "rules": [rule_statistics.as_dict() for rule_statistics in self.rules],
+            "operator_caches": operator_caches,
+        }
+
+
+def _instrument_function(function, rule_statistics):
+    """Wrap the operator :function, accounting its calls in :rule_statistics."""
+    perf_counter = time.perf_counter
+
+    def instrumented_function(field_value, *args):
+        start = perf_counter()
+        anonymized_value = function(field_value, *args)
+        rule_statistics.add_call(
+            perf_counter() - start, 1, 1 if field_value is None else 0
+        )
+        return anonymized_value
+
+    return instrumented_function
+
+
+def _instrument_batch_function(batch_function, rule_statistics):
+    """Wrap the batch operator :batch_function, accounting its calls in :rule_statistics."""
+    perf_counter = time.perf_counter
+
+    def instrumented_batch_function(field_values, *args):
+        start = perf_counter()
+        anonymized_values = batch_function(field_values, *args)
+        rule_statistics.add_call(
+            perf_counter() - start, len(field_values), field_values.count(None)
+        )
+        return anonymized_values
+
+    return instrumented_batch_function
+
+
+class InstrumentedExecutionPlan(ExecutionPlan):
+    """
+    InstrumentedExecutionPlan is an ExecutionPlan whose operators account their calls in RuleStatistics.
+
+    The operators of the rules are wrapped once when the plan is compiled, so that the ExecutionPlan used when the
+    instrumentation is disabled runs the operators as they are.
+    """
+
+    __slots__ = ("rule_statistics", "deferring_nodes")
+
+    def __init__(self, fields_to_anonymize, anonymization_operators):
+        """
+        Compile the fields to anonymize into an instrumented execution plan.
+
+        :param fields_to_anonymize: list of dictionaries containing the path, operation and args of each field
+        :param anonymization_operators: AnonymizationOperators instance the operations are bound to
+        :raise InitializationException: if an operation is not a known anonymization operator or has invalid args
+        """
+        super().__init__(fields_to_anonymize, anonymization_operators)
+        self.rule_statistics = []
+        for rule in self.rules:
+            rule_statistics = RuleStatistics(rule.path, rule.operation)
+            rule.function = _instrument_function(rule.function, rule_statistics)
+            if rule.batch_function is not None:
+                rule.batch_function = _instrument_batch_function(
+                    rule.batch_function, rule_statistics
+                )
+            self.rule_statistics.append(rule_statistics)
+
+        # the fields of a batchable node are anonymized after the traversal, so they are counted when collected
+        batchable_nodes = {}
+        plan_nodes = [self.root]
+        while plan_nodes:
+            plan_node = plan_nodes.pop()
+            if plan_node.batchable:
+                batchable_nodes[plan_node.rules[0]] = plan_node
+            plan_nodes.extend(plan_node.children)
+        self.deferring_nodes = tuple(batchable_nodes.get(rule) for rule in self.rules)
+
+    def _applications(self, deferred_fields):
+        """Return, for each rule, the number of fields it has been applied to or collected for."""
+        return [
+            rule_statistics.count
+            + (len(deferred_fields.get(plan_node, ())) if plan_node else 0)
+            for rule_statistics, plan_node in zip(
+                self.rule_statistics, self.deferring_nodes
+            )
+        ]
+
+    def _count_skips(self, applications_before, deferred_fields):
+        """Increase the skip count of the rules not applied since :applications_before was taken."""
+        for rule_statistics, before, after in zip(
+            self.rule_statistics,
+            applications_before,
+            self._applications(deferred_fields),
+        ):
+            if before == after:
+                rule_statistics.skip_count += 1
+
+    def apply(self, target_json):
+        """
+        Anonymize the json dictionary in place.
+
+        :param target_json: target json as dictionary
+        :return: the anonymized :target_json
+        """
+        applications_before = self._applications({})
+        self._apply_rules(target_json, None)
+        self._count_skips(applications_before, {})
+        return target_json
+
+    def apply_many(self, target_jsons):
+        """
+        Anonymize the list of json dictionaries in place, see ExecutionPlan.apply_many.
+
+        :param target_jsons: list of json dictionaries
+        :return: the anonymized :target_jsons
+        """
+        deferred_fields = collections.defaultdict(list)
+        for target_json in target_jsons:
+            applications_before = self._applications(deferred_fields)
+            self._apply_rules(target_json, deferred_fields)
+            self._count_skips(applications_before, deferred_fields)
+        self._apply_deferred(deferred_fields)
+        return target_jsons
@@ -1,16 +1,29 @@
 # -*- coding: utf-8 -*-
 
 """This script contains the AnonymizationOperators class, container for all the anonymization operators."""
-from typing import Union
-
-from anonymizer.encryption import SymmetricEncryption
+from typing import Pattern, Union
+
+from anonymizer.codec import get_codec
+from anonymizer.conditional import compile_conditional_operations
+from anonymizer.date_patterns import DatePattern, DateStrMemo, compile_date_pattern
+from anonymizer.domains import TestDomains
+from anonymizer.timestamps import (
+    MonthBucketCache,
+    posix_seconds,
+    posix_seconds_from_milliseconds,
+    truncate_to_month,
+    truncate_to_month_many,
+)
 import numbers
-import datetime
 import re
 import builtins
-import operator
 import json
-import glom
+import functools
+
+# max number of date strings cached for each pattern of truncate_day_from_str
+DEFAULT_DATE_STR_CACHE_SIZE = 4096
+# args of truncate_day_from_str compiled by compile_args, truncating the date strings with their method truncate_day
+_COMPILED_DATE_PATTERN_TYPES = (DatePattern, DateStrMemo)
 
 
 class AnonymizationOperators:
@@ -32,11 +45,17 @@ class AnonymizationOperators:
         Round float to ndigits decimal digits.
     encrypt(field_value)
         Encrypt the field using the encryption secret
+    encrypt_many(field_values)
+        Encrypt each field of the list using the encryption secret
+    decrypt(field_value)
+        Decrypt the field using the encryption secret
+    decrypt_many(field_values)
+        Decrypt each field of the list using the encryption secret
     is_string_present(field_value)
         Return "false" if :field_value is empty, white-spaces, null or not a String; "true" otherwise.
     is_number_present(field_value)
         Return 0 if :field_value is null or not a number, 1 otherwise.
-    is_email_present_or_test(field_value, test_domains)
+    is_email_present_or_test(field_value, test_domains, match_subdomains)
         Return a string representing the existence of the email (true, false, invalid, test)
     is_slug_present_or_test(field_value)
         Return a string representing the existence of the slug (true, false, test)
@@ -44,8 +63,12 @@ class AnonymizationOperators:
         Return the given date with its day set to first of the month and the time part zeroed.
     truncate_day_from_posix_timestamp(field_value)
         Return the given :posix_timestamp with its day set to first of the month and the time part zeroed.
+    truncate_day_from_posix_timestamp_many(field_values)
+        Apply truncate_day_from_posix_timestamp to each field of the list.
     truncate_day_from_epoch_milliseconds(field_value)
         Return the given :milliseconds_since_epoch with its day set to first of the month and the time part zeroed.
+    truncate_day_from_epoch_milliseconds_many(field_values)
+        Apply truncate_day_from_epoch_milliseconds to each field of the list.
     replace_regex_matches_with_string(field_value, pattern, repl)
         Return the string obtained by replacing the occurrences of :pattern in :field_value by the replacement :repl.
     conditional_operation(field_dict, conditional_args)
@@ -58,18 +81,185 @@ class AnonymizationOperators:
         Serialize the field :field_value to JSON string.
     convert_to_field_length(field_value)
         Return the length of :field_value (string/array).
+
+    compile_args(operation, args)
+        Return the args of :operation precompiled, to be passed to the operator instead of :args.
+
+    An operator can have a batch variant named <operator>_many, taking the list of field values (followed by the same
+    args) and returning the list of anonymized values. The Anonymizer uses it to anonymize batches of JSON.
     """
 
     symmetric_encryptor = None
-
-    def __init__(self, encryption_secret=None):
+    json_codec = None
+    # LRU caches of encrypt/decrypt results, keyed on the string value (None if disabled)
+    _encrypt_cache = None
+    _decrypt_cache = None
+    # months of the timestamps recently truncated, in seconds and in milliseconds
+    _posix_timestamp_months = None
+    _epoch_milliseconds_months = None
+
+    def __init__(
+        self,
+        encryption_secret=None,
+        encryption_cache_size=None,
+        json_codec=None,
+        date_str_cache_size=DEFAULT_DATE_STR_CACHE_SIZE,
+    ):
         """
         Initialize the AnonymizationOperators.
 
         :param encryption_secret: secret used by the encrypt operation
-        """
+        :param encryption_cache_size: max number of values whose encryption (and decryption) result is cached,
+                                      caching is disabled if None or 0
+        :param json_codec: JsonCodec used to parse the JSON strings of the fields, the default one if None
+        :param date_str_cache_size: max number of date strings whose truncate_day_from_str result is cached, for
+                                    each pattern compiled by compile_args; caching is disabled if None or 0
+        """
+        self.json_codec = json_codec or get_codec()
+        self.date_str_cache_size = date_str_cache_size
+        # DateStrMemo by pattern, created when compiling the args of truncate_day_from_str
+        self._date_str_memos = {}
+        self._posix_timestamp_months = MonthBucketCache()
+        self._epoch_milliseconds_months = MonthBucketCache(scale=1000)
         if encryption_secret:
+            # imported here, so that pycryptodome is loaded only if encryption is used
+            from anonymizer.encryption import SymmetricEncryption
+
             self.symmetric_encryptor = SymmetricEncryption(encryption_secret)
+            if encryption_cache_size:
+                # encryption is deterministic, so the result of a value can be cached
+                self._encrypt_cache = functools.lru_cache(
+                    maxsize=encryption_cache_size
+                )(self.symmetric_encryptor.encrypt)
+                self._decrypt_cache = functools.lru_cache(
+                    maxsize=encryption_cache_size
+                )(self.symmetric_encryptor.decrypt)
+
+    def encryption_cache_info(self):
+        """
+        Return the statistics of the encryption caches.
+
+        :return: dictionary with keys "encrypt" and "decrypt", each one a functools CacheInfo named tuple
+                 (hits, misses, maxsize, currsize). None if caching is disabled.
+        """
+        if self._encrypt_cache is None:
+            return None
+        return {
+            "encrypt": self._encrypt_cache.cache_info(),
+            "decrypt": self._decrypt_cache.cache_info(),
+        }
+
+    @property
+    def operator_caches(self):
+        """
+        Caches of operator results, by operator name (followed by ":<pattern>" for truncate_day_from_str).
+
+        Each cache has the methods info(), returning its counters as dictionary, and reset_counters().
+        """
+        operator_caches = {
+            "truncate_day_from_posix_timestamp": self._posix_timestamp_months,
+            "truncate_day_from_epoch_milliseconds": self._epoch_milliseconds_months,
+        }
+        for pattern, date_str_memo in self._date_str_memos.items():
+            operator_caches["truncate_day_from_str:{}".format(pattern)] = date_str_memo
+        return operator_caches
+
+    def operator_cache_info(self):
+        """
+        Return the statistics of the caches of operator results.
+
+        :return: dictionary with, for each operator having a cache, the counters of the cache (e.g. "hits" and
+                 "misses")
+        """
+        return {
+            operation: cache.info() for operation, cache in self.operator_caches.items()
+        }
+
+    # name of the operators whose args can be precompiled, with the method compiling them
+    _ARGS_COMPILERS = {
+        "replace_regex_matches_with_string": "_compile_replace_regex_args",
+        "conditional_operation": "_compile_conditional_args",
+        "split_anonymize_and_join": "_compile_nested_operation_args",
+        "apply_function_on_field_in_json_string": "_compile_nested_operation_args",
+        "truncate_day_from_str": "_compile_date_pattern_args",
+        "is_email_present_or_test": "_compile_test_domains_args",
+    }
+
+    def compile_args(self, operation, args):
+        """
+        Return the args of :operation precompiled, to be passed to the operator instead of :args.
+
+        Called once when the json-schema is compiled, so that the operators do not have to parse their args for
+        each value (e.g. regexes are compiled) and invalid args are reported before anonymizing any JSON.
+        The operators keep accepting the args in their json-schema form as well.
+
+        :param operation: name of the anonymization operation
+        :param args: list of args of the operation, as specified in the json-schema
+        :return: list of precompiled args
+        :raise ValueError: if the args are not valid
+        """
+        args_compiler = self._ARGS_COMPILERS.get(operation)
+        if args_compiler is None:
+            return list(args)
+        return getattr(self, args_compiler)(list(args))
+
+    def _compile_replace_regex_args(self, args):
+        """Compile the regex pattern of replace_regex_matches_with_string."""
+        if args and isinstance(args[0], str):
+            try:
+                args[0] = re.compile(args[0])
+            except re.error as e:
+                raise ValueError("invalid regex {!r}: {}".format(args[0], e))
+        return args
+
+    def _compile_conditional_args(self, args):
+        """Compile the conditional args of conditional_operation into a tuple of ConditionalOperation."""
+        if args:
+            args[0] = compile_conditional_operations(args[0], self)
+        return args
+
+    def _compile_date_pattern_args(self, args):
+        """
+        Compile the pattern of truncate_day_from_str into a DatePattern, if it is made of numeric directives.
+
+        If the cache is enabled, the pattern is compiled into the DateStrMemo of the pattern instead, shared by all
+        the fields having the same pattern.
+        """
+        if args and isinstance(args[0], str):
+            pattern = args[0]
+            date_pattern = compile_date_pattern(pattern)
+            if self.date_str_cache_size:
+                date_str_memo = self._date_str_memos.get(pattern)
+                if date_str_memo is None:
+                    if date_pattern is not None:
+                        truncate_day = date_pattern.truncate_day
+                    else:
+                        truncate_day = functools.partial(
+                            self._truncate_day_with_strptime, date_pattern=pattern
+                        )
+                    date_str_memo = self._date_str_memos[pattern] = DateStrMemo(
+                        pattern, truncate_day, self.date_str_cache_size
+                    )
+                args[0] = date_str_memo
+            elif date_pattern is not None:
+                args[0] = date_pattern
+        return args
+
+    def _compile_test_domains_args(self, args):
+        """Normalize the test domains of is_email_present_or_test into TestDomains."""
+        if args and isinstance(args[0], (list, tuple)):
+            args[0] = TestDomains(args[0], len(args) > 1 and args[1])
+        return args
+
+    def _compile_nested_operation_args(self, args):
+        """Compile the function_args of the operation applied by split_anonymize_and_join and similar operators."""
+        if args and isinstance(args[0], dict) and "function" in args[0]:
+            anonymize_args = dict(args[0])
+            anonymize_args["function_args"] = self.compile_args(
+                anonymize_args["function"], anonymize_args.get("function_args", [])
+            )
+            args[0] = anonymize_args
+        return args
 
     def round_ip(self, field_value: str):
         """
@@ -127,8 +317,25 @@ class AnonymizationOperators:
             raise Exception("Encryption secret not set")
         # cast to string, e.g. for ids that come as type integer
         field_value = str(field_value)
+        if self._encrypt_cache is not None:
+            return self._encrypt_cache(field_value)
         return self.symmetric_encryptor.encrypt(field_value)
 
+    def encrypt_many(self, field_values):
+        """
+        Encrypt each field of the list using the encryption secret.
+
+        :param field_values: list of fields to encrypt
+        :return: list of encrypted fields
+        """
+        if self._encrypt_cache is not None:
+            return self._apply_to_not_null_values(
+                field_values, lambda values: list(map(self._encrypt_cache, values))
+            )
+        return self._apply_to_not_null_values(
+            field_values, lambda values: self.symmetric_encryptor.encrypt_many(values)
+        )
+
     def decrypt(self, field_value):
         """
         Decrypt the field using the encryption secret.
@@ -139,8 +346,48 @@ class AnonymizationOperators:
             return None
         if not self.symmetric_encryptor:
             raise Exception("Encryption secret not set")
+        if self._decrypt_cache is not None:
+            return self._decrypt_cache(field_value)
         return self.symmetric_encryptor.decrypt(field_value)
 
+    def decrypt_many(self, field_values):
+        """
+        Decrypt each field of the list using the encryption secret.
+
+        :param field_values: list of fields to decrypt
+        :return: list of decrypted fields
+        """
+        if self._decrypt_cache is not None:
+            return self._apply_to_not_null_values(
+                field_values, lambda values: list(map(self._decrypt_cache, values))
+            )
+        return self._apply_to_not_null_values(
+            field_values, lambda values: self.symmetric_encryptor.decrypt_many(values)
+        )
+
+    def _apply_to_not_null_values(self, field_values, batch_cipher_function):
+        """
+        Apply :batch_cipher_function to the not null values of :field_values, keeping the nulls in place.
+
+        Non string values are cast to string, e.g. for ids that come as type integer.
+
+        :param field_values: list of fields
+        :param batch_cipher_function: function taking and returning a list of strings
+        :return: list of the results of :batch_cipher_function and nulls
+        """
+        values = [
+            str(field_value) for field_value in field_values if field_value is not None
+        ]
+        if not values:
+            return [None] * len(field_values)
+        if not self.symmetric_encryptor:
+            raise Exception("Encryption secret not set")
+        results = iter(batch_cipher_function(values))
+        return [
+            None if field_value is None else next(results)
+            for field_value in field_values
+        ]
+
     def is_string_present(self, field_value):
         """
         Return "false" if :field_value is empty, white-spaces, null or not a String; "true" otherwise.
@@ -174,28 +421,32 @@ class AnonymizationOperators:
             return 0
         return len(field_value)
 
-    def is_email_present_or_test(self, field_value, test_domains):
+    def is_email_present_or_test(
+        self, field_value, test_domains, match_subdomains=False
+    ):
         """
         Return a string representing the existence of the email (true, false, invalid, test)
 
         In detail:
          - "false" if value is missing,
          - "true" if value is a valid email address,
-         - "test" if value is valid email address and its email domain is in the list of :test_domains
+         - "test" if value is valid email address and its email domain is in the list of :test_domains (or is a
+           subdomain of one of them if :match_subdomains)
          - "invalid" if value is not valid email after a naive check (does not contain @).
 
+        :param test_domains: list of test domains, or TestDomains compiled from it by compile_args
+        :param match_subdomains: whether the subdomains of the test domains are test domains too
         :return: string representing if :field_value is present or if it is test email
         """
-        is_present = self.is_string_present(field_value)
-        if is_present == "true":
-            if "@" not in field_value:
-                # basic check if value is a valid email
-                return "invalid"
-            domain = (field_value.split("@")[1]).lower().strip()
-            test_domains = [test_domain.lower().strip() for test_domain in test_domains]
-            if domain in test_domains:
-                return "test"
-        return is_present
+        if type(field_value) is not str or not field_value.strip():
+            return "false"
+        if "@" not in field_value:
+            # basic check if value is a valid email
+            return "invalid"
+        domain = field_value.split("@", 2)[1].lower().strip()
+        if type(test_domains) is not TestDomains:
+            test_domains = TestDomains(test_domains, match_subdomains)
+        return "test" if domain in test_domains else "true"
 
     def truncate_day_from_str(self, date_str, date_pattern):
         """
@@ -204,12 +455,21 @@ class AnonymizationOperators:
         Input :date_str and output follow the :date_pattern
         Reference for :date_pattern https://docs.python.org/3/library/datetime.html#strftime-and-strptime-format-codes
 
+        :param date_pattern: strptime pattern, or DatePattern or DateStrMemo compiled from it by compile_args
         :return: string representing the input date :date_str with the day set to 1 and with the time zeroed.
         """
+        if type(date_pattern) in _COMPILED_DATE_PATTERN_TYPES:
+            return date_pattern.truncate_day(date_str)
+        return self._truncate_day_with_strptime(date_str, date_pattern)
+
+    def _truncate_day_with_strptime(self, date_str, date_pattern):
+        """Implement truncate_day_from_str with strptime, for any :date_pattern."""
         if self.is_string_present(date_pattern) == "false":
             return "invalid_pattern: missing"
         if self.is_string_present(date_str) == "false":
             return None
+        import datetime
+
         try:
             date = datetime.datetime.strptime(date_str, date_pattern)
         except ValueError:
@@ -230,6 +490,68 @@ class AnonymizationOperators:
         )
         return anonymized_date_str
 
+    def _timestamp_in_cache_unit(self, timestamp, to_posix_seconds, month_cache):
+        """
+        Return :timestamp as integer in the unit of :month_cache, truncated to the second if it is not an integer.
+
+        :return: integer, None if :timestamp is not a valid timestamp
+        """
+        if type(timestamp) is int:
+            return timestamp
+        if self.is_number_present(timestamp) == 0:
+            return None
+        seconds = to_posix_seconds(timestamp)
+        if seconds is None:
+            return None
+        return seconds * month_cache.scale
+
+    def _truncate_to_month(self, timestamp, to_posix_seconds, month_cache):
+        """
+        Return :timestamp truncated to the first of the month, looking up the month in :month_cache first.
+
+        :param to_posix_seconds: function converting :timestamp to integer POSIX seconds (None if invalid)
+        :return: integer in the unit of :month_cache, None if :timestamp is not a valid timestamp
+        """
+        timestamp = self._timestamp_in_cache_unit(
+            timestamp, to_posix_seconds, month_cache
+        )
+        if timestamp is None:
+            return None
+        month_start = month_cache.get(timestamp)
+        if month_start is None:
+            seconds = to_posix_seconds(timestamp)
+            if seconds is None:
+                return None
+            month_start = month_cache.add(truncate_to_month(seconds))
+        return month_start
+
+    def _truncate_to_month_many(self, timestamps, to_posix_seconds, month_cache):
+        """
+        Apply _truncate_to_month to each timestamp, truncating the ones not found in :month_cache as a batch.
+
+        :return: list of integers in the unit of :month_cache, None for the invalid timestamps
+        """
+        month_starts = []
+        # positions in :month_starts and POSIX seconds of the timestamps not found in :month_cache
+        missed_positions = []
+        missed_seconds = []
+        for timestamp in timestamps:
+            timestamp = self._timestamp_in_cache_unit(
+                timestamp, to_posix_seconds, month_cache
+            )
+            month_start = None if timestamp is None else month_cache.get(timestamp)
+            if month_start is None and timestamp is not None:
+                seconds = to_posix_seconds(timestamp)
+                if seconds is not None:
+                    missed_positions.append(len(month_starts))
+                    missed_seconds.append(seconds)
+            month_starts.append(month_start)
+        for position, month_start in zip(
+            missed_positions, truncate_to_month_many(missed_seconds)
+        ):
+            month_starts[position] = month_cache.add(month_start)
+        return month_starts
+
     def truncate_day_from_posix_timestamp(self, posix_timestamp):
         """
         Return the given :posix_timestamp with its day set to first of the month and the time part zeroed.
@@ -238,21 +560,19 @@ class AnonymizationOperators:
 
         :return: integer representing the :posix_timestamp of the truncated input date
         """
-        if self.is_number_present(posix_timestamp) == 0:
-            return None
-        try:
-            date = datetime.datetime.utcfromtimestamp(posix_timestamp)
-        except Exception:
-            return None
-        truncated_date = date.replace(
-            day=1,
-            second=0,
-            minute=0,
-            hour=0,
-            microsecond=0,
-            tzinfo=datetime.timezone.utc,
+        return self._truncate_to_month(
+            posix_timestamp, posix_seconds, self._posix_timestamp_months
+        )
+
+    def truncate_day_from_posix_timestamp_many(self, posix_timestamps):
+        """
+        Apply truncate_day_from_posix_timestamp to each field of the list.
+
+        :return: list of integers representing the :posix_timestamps of the truncated input dates
+        """
+        return self._truncate_to_month_many(
+            posix_timestamps, posix_seconds, self._posix_timestamp_months
         )
-        return int(datetime.datetime.timestamp(truncated_date))
 
     def truncate_day_from_epoch_milliseconds(self, milliseconds_since_epoch):
         """
@@ -260,35 +580,43 @@ class AnonymizationOperators:
 
         :return: integer representing the milliseconds since epoch of the truncated input date
         """
-        if self.is_number_present(milliseconds_since_epoch) == 0:
-            return None
-        seconds_since_epoch = milliseconds_since_epoch / 1000
-        truncated_unix_timestamp = self.truncate_day_from_posix_timestamp(
-            seconds_since_epoch
+        return self._truncate_to_month(
+            milliseconds_since_epoch,
+            posix_seconds_from_milliseconds,
+            self._epoch_milliseconds_months,
         )
-        return (
-            truncated_unix_timestamp * 1000
-            if truncated_unix_timestamp is not None
-            else truncated_unix_timestamp
+
+    def truncate_day_from_epoch_milliseconds_many(self, milliseconds_since_epoch_list):
+        """
+        Apply truncate_day_from_epoch_milliseconds to each field of the list.
+
+        :return: list of integers representing the milliseconds since epoch of the truncated input dates
+        """
+        return self._truncate_to_month_many(
+            milliseconds_since_epoch_list,
+            posix_seconds_from_milliseconds,
+            self._epoch_milliseconds_months,
         )
 
     def replace_regex_matches_with_string(
-        self, field_value: str, pattern: str, repl: str
+        self, field_value: str, pattern: Union[str, Pattern], repl: str
     ):
         """
         Return the string obtained by replacing the occurrences of :pattern in :field_value by the replacement :repl.
 
         :param field_value: the input string
-        :param pattern: string representing the regex matching the substrings to be replaced
+        :param pattern: string representing the regex matching the substrings to be replaced, or the compiled regex
         :param repl: the string that is going to take the place of the matching sub-strings
         :return: string with replaced text
         """
         if field_value is None:
             return None
-        return re.sub(pattern, repl, field_value)
+        if isinstance(pattern, str):
+            return re.sub(pattern, repl, field_value)
+        return pattern.sub(repl, field_value)
 
     def conditional_operation(
-        self, field_dict: dict, conditional_args: Union[dict, list]
+        self, field_dict: dict, conditional_args: Union[dict, list, tuple]
     ):
         """
         Evaluate condition(s) and apply specified anonymization operation if the condition is met. Also works for
@@ -300,7 +628,8 @@ class AnonymizationOperators:
             - conditional_operators
 
         :param field_dict: dictionary containing the field to apply operation on if condition is met
-        :param conditional_args: dictionary or list of dictionaries containing the conditional arguments:
+        :param conditional_args: dictionary or list of dictionaries containing the conditional arguments (or the tuple of
+               ConditionalOperation they are compiled into by compile_args):
                - function: anonymization operation to perform
                - function_args (optional): additional arguments for the operation to perform (default is empty list)
                - target_field: field inside the dictionary to apply the operation on
@@ -340,145 +669,11 @@ class AnonymizationOperators:
         """
         if field_dict is None:
             return None
-
-        def contains_wrapper(a, b):
-            """
-            Check if a is in b
-            :param a: value to search in b
-            :param b: any data type an "in" operator can be applied on (e.g. list, tuple, string)
-            :return: boolean, whether a is in b or not
-            """
-            return operator.contains(b, a)
-
-        def not_contains(a, b):
-            """
-            Check if a is not in b
-            :param a: value to search in b
-            :param b: any data type an "in" operator can be applied on (e.g. list, tuple, string)
-            :return: boolean, if a is in b -> False, True otherwise
-            """
-            return not contains_wrapper(a, b)
-
-        def evaluate_condition(
-            field_dict, cond_field, cond_value, cond_operator, value_when_null
-        ):
-            """
-            Evaluate single condition
-            :return: boolean
-            """
-            path = cond_field.split(".")
-            value = field_dict
-            for p in path:
-                value = value[p]
-            if value is None:
-                return cond_operator(value_when_null, cond_value)
-            else:
-                return cond_operator(value, cond_value)
-
-        def ensure_type_list(co):
-            """
-            Convert input into a list, e.g. "123" -> ["123], ["123", "234"] -> ["123", "234"]
-            :return: list
-            """
-            if not isinstance(co, list):
-                return [co], 1
-            else:
-                return co, len(co)
-
-        def execute_conditional_operator(conditional_args_dict):
-            """
-            Execute the conditional operation given the conditional arguments.
-            :param conditional_args_dict: dictionary containing conditional arguments
-            """
-            target_field = conditional_args_dict["target_field"]
-            # Check if the `target_field` path exists in the `field_dict`. In the previous versions we only checked if
-            # the final attribute in the path exists. However, for some messages (e.g. sport_activity) it can happen
-            # that a full object is missing. For example, the 'source_content' object in attributes.source_content.id
-            # can be missing. In case the path is not valid, the operation will be skipped. This also means that typos
-            # in `target_field` are ignored and no error is raised!
-            try:
-                glom.glom(field_dict, target_field)
-            except glom.core.PathAccessError:
-                return
-
-            conditional_field_values_when_null, len1 = ensure_type_list(
-                conditional_args_dict["conditional_field_values_when_null"]
-            )
-            conditional_operators, len2 = ensure_type_list(
-                conditional_args_dict["conditional_operators"]
-            )
-            conditional_fields, len3 = ensure_type_list(
-                conditional_args_dict["conditional_fields"]
-            )
-            conditional_values, len4 = ensure_type_list(
-                conditional_args_dict["conditional_values"]
-            )
-            conditional_boolean_function = conditional_args_dict.get(
-                "conditional_boolean_function", "and"
-            )
-            # check if all necessary information was provided
-            if not len1 == len2 == len3 == len4:
-                raise ValueError(
-                    "Provided conditional argument lists are different in length!"
-                )
-            cond_result = None
-            for op, field, value, value_when_null in zip(
-                conditional_operators,
-                conditional_fields,
-                conditional_values,
-                conditional_field_values_when_null,
-            ):
-                conditional_operator = operator_symbol_function_map[op]
-                res = evaluate_condition(
-                    field_dict, field, value, conditional_operator, value_when_null
-                )
-                if cond_result is None:
-                    cond_result = res
-                else:
-                    cond_result = operator_symbol_function_map[
-                        conditional_boolean_function
-                    ](cond_result, res)
-            if cond_result:
-                anonymization_operation = self.__getattribute__(
-                    conditional_args_dict["function"]
-                )
-                function_args = conditional_args_dict.get("function_args", [])
-                parts = conditional_args_dict["target_field"].split(".")
-                root = field_dict
-                last_key = parts[-1]
-                if len(parts) > 1:
-                    for key in parts[:-1]:
-                        root = root[key]
-                if isinstance(root[last_key], list):
-                    root[last_key] = [
-                        anonymization_operation(v, *function_args)
-                        for v in root[last_key]
-                    ]
-                else:
-                    root[last_key] = anonymization_operation(
-                        root[last_key], *function_args
-                    )
-
-        operator_symbol_function_map = {
-            "<": operator.lt,
-            "<=": operator.le,
-            "==": operator.eq,
-            "=": operator.eq,
-            "!=": operator.ne,
-            ">": operator.gt,
-            ">=": operator.ge,
-            "and": operator.and_,
-            "or": operator.or_,
-            "in": contains_wrapper,
-            "not in": not_contains,
-        }
-
-        if type(conditional_args) == list:
-            for cond_arg in conditional_args:
-                execute_conditional_operator(cond_arg)
-        else:
-            execute_conditional_operator(conditional_args)
-
+        if not isinstance(conditional_args, tuple):
+            # args not compiled with the json-schema (see compile_args)
+            conditional_args = compile_conditional_operations(conditional_args, self)
+        for conditional_operation in conditional_args:
+            conditional_operation.apply(field_dict)
         return field_dict
 
     def split_anonymize_and_join(self, field_value: str, anonymize_args: dict):
@@ -537,7 +732,7 @@ class AnonymizationOperators:
         operation = self.__getattribute__(anonymize_args["function"])
         cast_to = getattr(builtins, anonymize_args.get("cast_element_to", "str"))
         function_args = anonymize_args.get("function_args", [])
-        field_value = json.loads(field_value)
+        field_value = self.json_codec.loads(field_value)
         target_field = anonymize_args["target_field"]
         if target_field in field_value.keys():
             try:
@@ -546,6 +741,7 @@ class AnonymizationOperators:
                 value = None
             field_value[target_field] = operation(value, *function_args)
 
+        # serialized with the json module whatever the JSON backend, not to change the format of the string
         return json.dumps(field_value)
 
     def serialize_to_json_string(self, field_value):
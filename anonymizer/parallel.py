@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definition of the class ParallelAnonymizer."""
+
+import json
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from anonymizer import Anonymizer
+from anonymizer.exceptions import WorkerException
+from anonymizer.operators import DEFAULT_DATE_STR_CACHE_SIZE
+from anonymizer.stream import (
+    ON_ERROR_FAIL,
+    StreamStatistics,
+    _anonymize_lines,
+    _batches,
+    _handle_failures,
+    _validate_error_policy,
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Anonymizer of the worker process, created once by _initialize_worker
+_worker_anonymizer = None
+
+
+def _initialize_worker(
+    json_schema_str,
+    encryption_secret,
+    encryption_cache_size,
+    json_backend,
+    date_str_cache_size,
+):
+    """Create the Anonymizer of the worker process."""
+    global _worker_anonymizer
+    _worker_anonymizer = Anonymizer(
+        json_schema_str=json_schema_str,
+        encryption_secret=encryption_secret,
+        encryption_cache_size=encryption_cache_size,
+        json_backend=json_backend,
+        date_str_cache_size=date_str_cache_size,
+    )
+
+
+def _anonymize_chunk(chunk_id, chunk):
+    """
+    Anonymize a chunk of NDJSON lines in the worker process.
+
+    :param chunk_id: identifier of the chunk, returned as is
+    :param chunk: bytes of newline terminated NDJSON lines
+    :return: tuple (chunk_id, bytes of the anonymized lines, list of tuples (index of the failing line, error message))
+    """
+    lines = chunk.split(b"\n")[:-1]
+    anonymized_lines, failures = _anonymize_lines(_worker_anonymizer, lines)
+    return chunk_id, b"".join(anonymized_lines), failures
+
+
+class ParallelAnonymizer:
+    """
+    ParallelAnonymizer anonymizes NDJSON lines using a pool of worker processes.
+
+    The json-schema and the encryption secret are sent once to each worker, which creates its own Anonymizer. The
+    lines are then sent to the workers in chunks of raw bytes and the anonymized lines come back as raw bytes,
+    so that the parent process does not parse nor serialize any JSON. If a worker process stops unexpectedly (e.g.
+    killed when out of memory), the chunks sent to it are lost: anonymize_ndjson raises a WorkerException instead of
+    waiting for them.
+
+    Methods
+    -------
+    anonymize_ndjson(lines, on_error, dead_letter_file, statistics)
+        Anonymize a stream of NDJSON lines, yielding chunks of anonymized lines
+    close()
+        Wait for the worker processes to complete and stop them
+    terminate()
+        Cancel the chunks not sent to a worker yet and stop the worker processes
+
+    ParallelAnonymizer is a context manager, closing the pool on exit.
+    """
+
+    def __init__(
+        self,
+        json_schema=None,
+        json_schema_str=None,
+        encryption_secret=None,
+        encryption_cache_size=None,
+        json_backend=None,
+        workers=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        ordered=True,
+        date_str_cache_size=DEFAULT_DATE_STR_CACHE_SIZE,
+    ):
+        """
+        Create the ParallelAnonymizer with the specified schema, the worker processes start with the first chunks.
+
+        :param json_schema: json-schema dictionary
+        :param json_schema_str: json schema as string
+        :param encryption_secret: secret used by the operation 'encrypt'
+        :param encryption_cache_size: max number of encrypted values cached by each worker, disabled if None or 0
+        :param json_backend: JSON library used by the workers, see Anonymizer
+        :param workers: number of worker processes (default: number of CPUs)
+        :param chunk_size: number of lines sent together to a worker
+        :param ordered: whether the anonymized lines follow the order of the input lines
+        :param date_str_cache_size: max number of date strings whose truncate_day_from_str result is cached by each
+                                    worker, for each pattern; disabled if None or 0
+        """
+        # compile the schema here as well, so that an invalid schema fails before starting the workers
+        anonymizer = Anonymizer(
+            json_schema=json_schema,
+            json_schema_str=json_schema_str,
+            encryption_secret=encryption_secret,
+            json_backend=json_backend,
+            date_str_cache_size=date_str_cache_size,
+        )
+        if json_schema_str is None:
+            json_schema_str = json.dumps(anonymizer.json_schema)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive, got {}".format(chunk_size))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        # bound the chunks waiting for a worker or for being yielded, to keep the memory constant
+        self.max_chunks_in_flight = 2 * self.workers
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            initializer=_initialize_worker,
+            initargs=(
+                json_schema_str,
+                encryption_secret,
+                encryption_cache_size,
+                anonymizer.json_codec.name,
+                date_str_cache_size,
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def close(self):
+        """Wait for the worker processes to complete and stop them."""
+        self._executor.shutdown(wait=True)
+
+    def terminate(self):
+        """Cancel the chunks not sent to a worker yet and stop the worker processes once their chunk completes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def anonymize_ndjson(
+        self, lines, on_error=ON_ERROR_FAIL, dead_letter_file=None, statistics=None
+    ):
+        """
+        Anonymize a stream of NDJSON lines, yielding chunks of anonymized lines.
+
+        Empty lines are ignored. With ordered=False, chunks are yielded as soon as a worker completes them.
+
+        :param lines: iterable of NDJSON lines as bytes (e.g. a file opened in binary mode)
+        :param on_error: what to do with a record that can not be anonymized, see anonymizer.stream.anonymize_ndjson
+        :param dead_letter_file: binary file object receiving the failing lines, required by "dead-letter"
+        :param statistics: optional StreamStatistics updated while consuming the stream
+        :return: generator of bytes, each containing the newline terminated anonymized lines of a chunk
+        :raise WorkerException: if a worker process stops unexpectedly
+        """
+        _validate_error_policy(on_error, dead_letter_file)
+        if statistics is None:
+            statistics = StreamStatistics()
+
+        results = queue.Queue()
+        # chunks sent to the workers and not yielded yet, by chunk id
+        chunks_in_flight = {}
+        completed_chunks = {}
+        next_chunk_id = 0
+
+        def collect(max_chunks_in_flight):
+            nonlocal next_chunk_id
+            while len(chunks_in_flight) > max_chunks_in_flight:
+                chunk_id, anonymized_chunk, failures = results.get().result()
+                completed_chunks[chunk_id] = (anonymized_chunk, failures)
+                if self.ordered:
+                    ready_chunk_ids = []
+                    while next_chunk_id in completed_chunks:
+                        ready_chunk_ids.append(next_chunk_id)
+                        next_chunk_id += 1
+                else:
+                    ready_chunk_ids = [chunk_id]
+                for ready_chunk_id in ready_chunk_ids:
+                    anonymized_chunk, failures = completed_chunks.pop(ready_chunk_id)
+                    line_numbers, chunk_lines = chunks_in_flight.pop(ready_chunk_id)
+                    _handle_failures(
+                        failures,
+                        line_numbers,
+                        chunk_lines,
+                        on_error,
+                        dead_letter_file,
+                        statistics,
+                    )
+                    statistics.records_written += len(chunk_lines) - len(failures)
+                    if anonymized_chunk:
+                        yield anonymized_chunk
+
+        try:
+            for chunk_id, (line_numbers, chunk_lines) in enumerate(
+                _batches(lines, self.chunk_size, statistics)
+            ):
+                chunk_lines = [
+                    line if line.endswith(b"\n") else line + b"\n"
+                    for line in chunk_lines
+                ]
+                chunks_in_flight[chunk_id] = (line_numbers, chunk_lines)
+                self._executor.submit(
+                    _anonymize_chunk, chunk_id, b"".join(chunk_lines)
+                ).add_done_callback(results.put)
+                yield from collect(self.max_chunks_in_flight - 1)
+            yield from collect(0)
+        except BrokenProcessPool as e:
+            # the results of the chunks sent to the stopped worker would never come
+            raise WorkerException(
+                "a worker process stopped unexpectedly, the records sent to it are lost"
+            ) from e
+        statistics.stop()
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definitions of the classes ExecutionPlan, PlanNode and AnonymizationRule."""
+
+import collections
+
+from anonymizer.exceptions import InitializationException
+
+ALL_ELEMENTS_IN_ARRAY_NOTATION = "[*]"
+
+
+class AnonymizationRule:
+    """
+    AnonymizationRule binds an anonymization operation to the field it has to be applied on.
+
+    Attributes
+    ----------
+    path : tuple
+        path chunks of the field to anonymize
+    operation : str
+        name of the anonymization operation
+    function : callable
+        anonymization operator bound to the AnonymizationOperators instance
+    batch_function : callable
+        batch variant of :function taking the list of field values, None if the operator has none
+    args : tuple
+        additional arguments passed to :function after the field value
+    """
+
+    __slots__ = ("path", "operation", "function", "batch_function", "args")
+
+    def __init__(self, path, operation, function, args, batch_function=None):
+        """
+        Create the AnonymizationRule.
+
+        :param path: path chunks of the field to anonymize
+        :param operation: name of the anonymization operation
+        :param function: bound anonymization operator
+        :param args: additional arguments of the anonymization operator
+        :param batch_function: bound batch variant of the anonymization operator
+        """
+        self.path = tuple(path)
+        self.operation = operation
+        self.function = function
+        self.batch_function = batch_function
+        self.args = tuple(args)
+
+
+class PlanNode:
+    """
+    Node of the prefix trie merging the paths of the fields to anonymize.
+
+    Attributes
+    ----------
+    path_chunk : str
+        key of the JSON object matched by the node, or ALL_ELEMENTS_IN_ARRAY_NOTATION
+    rules : tuple
+        AnonymizationRule whose path ends on this node, in the order they have been found in the json-schema
+    children : tuple
+        PlanNode matching the keys of the field value
+    batchable : bool
+        whether the matched fields can be collected across records and anonymized by a single batch call
+    """
+
+    __slots__ = ("path_chunk", "rules", "children", "batchable")
+
+    def __init__(self, path_chunk, rules=(), children=()):
+        """
+        Create the PlanNode.
+
+        :param path_chunk: key of the JSON object or ALL_ELEMENTS_IN_ARRAY_NOTATION
+        :param rules: rules to apply on the matched field
+        :param children: nodes to apply on the value of the matched field
+        """
+        self.path_chunk = path_chunk
+        self.rules = tuple(rules)
+        self.children = tuple(children)
+        # deferring a field is safe only if nothing else reads or writes it after its rule
+        self.batchable = (
+            not self.children
+            and len(self.rules) == 1
+            and self.rules[0].batch_function is not None
+        )
+
+
+class ExecutionPlan:
+    """
+    ExecutionPlan is the compiled form of the fields to anonymize found in a json-schema.
+
+    The paths of all the fields are merged into a trie of PlanNode, so that a JSON is anonymized traversing it just
+    once. Each node holds the AnonymizationRule to apply, with the operator already bound and the args as tuple.
+    A plan is not modified once compiled, so it can be swapped for another one while JSONs are being anonymized.
+
+    Attributes
+    ----------
+    payload_markers : tuple
+        quoted top-level keys of the fields to anonymize, None if serialized JSONs must always be parsed
+    payload_byte_markers : tuple
+        payload_markers encoded as UTF-8 bytes
+
+    Methods
+    -------
+    apply(target_json)
+        Anonymize the json dictionary in place
+    apply_many(target_jsons)
+        Anonymize the list of json dictionaries in place, running the batch operators once for the whole list
+    """
+
+    __slots__ = ("rules", "root", "payload_markers", "payload_byte_markers")
+
+    def __init__(self, fields_to_anonymize, anonymization_operators):
+        """
+        Compile the fields to anonymize into an execution plan.
+
+        :param fields_to_anonymize: list of dictionaries containing the path, operation and args of each field
+        :param anonymization_operators: AnonymizationOperators instance the operations are bound to
+        :raise InitializationException: if an operation is not a known anonymization operator or has invalid args
+        """
+        self.rules = tuple(
+            self._compile_rule(field_to_anonymize, anonymization_operators)
+            for field_to_anonymize in fields_to_anonymize
+        )
+        self.root = self._compile_trie(self.rules)
+        self._compile_payload_markers()
+
+    @staticmethod
+    def _compile_rule(field_to_anonymize, anonymization_operators):
+        """
+        Bind the operation of :field_to_anonymize to :anonymization_operators.
+
+        :return: AnonymizationRule
+        """
+        path = field_to_anonymize["path"]
+        operation = field_to_anonymize["operation"]
+        function = None
+        if isinstance(operation, str) and not operation.startswith("_"):
+            function = getattr(anonymization_operators, operation, None)
+        if not callable(function):
+            raise InitializationException(
+                "Unknown anonymization operation {!r} for the field {!r}".format(
+                    operation, "/".join(path)
+                )
+            )
+        try:
+            args = anonymization_operators.compile_args(
+                operation, field_to_anonymize.get("args", [])
+            )
+        except ValueError as e:
+            raise InitializationException(
+                "Invalid args of the anonymization operation {!r} for the field {!r}: {}".format(
+                    operation, "/".join(path), e
+                )
+            ) from e
+        # operators can provide a batch variant named <operation>_many
+        batch_function = getattr(anonymization_operators, operation + "_many", None)
+        return AnonymizationRule(path, operation, function, args, batch_function)
+
+    @staticmethod
+    def _compile_trie(rules):
+        """
+        Merge the paths of :rules into a trie of PlanNode.
+
+        Rules on the root of the schema (empty path) are not part of the trie, as they have never been applied.
+
+        :return: root PlanNode, its children match the first chunk of the paths
+        """
+
+        def build_node(path_chunk, trie):
+            return PlanNode(
+                path_chunk,
+                trie["rules"],
+                [build_node(k, sub_trie) for k, sub_trie in trie["children"].items()],
+            )
+
+        root = {"rules": [], "children": {}}
+        for rule in rules:
+            trie = root
+            for path_chunk in rule.path:
+                trie = trie["children"].setdefault(
+                    path_chunk, {"rules": [], "children": {}}
+                )
+            trie["rules"].append(rule)
+        return build_node(None, {"rules": [], "children": root["children"]})
+
+    @property
+    def first_path_chunks(self):
+        """Set of the first chunks of the paths of the fields to anonymize, e.g. the top-level keys."""
+        return frozenset(plan_node.path_chunk for plan_node in self.root.children)
+
+    def _compile_payload_markers(self):
+        """
+        Compute the strings whose presence in a serialized json means that it may contain fields to anonymize.
+
+        A field to anonymize can be in a json only if one of the top-level keys of the paths appears quoted in it.
+        The check is not possible if a path starts with an array or a key contains characters escaped in JSON: the
+        markers are None then.
+        """
+        self.payload_markers = None
+        self.payload_byte_markers = None
+        markers = []
+        for path_chunk in self.first_path_chunks:
+            if path_chunk == ALL_ELEMENTS_IN_ARRAY_NOTATION or any(
+                c in '"\\' or c < " " for c in path_chunk
+            ):
+                return
+            markers.append('"{}"'.format(path_chunk))
+        self.payload_markers = tuple(markers)
+        self.payload_byte_markers = tuple(marker.encode("utf-8") for marker in markers)
+
+    def _apply_rules(self, target_json, deferred_fields):
+        """
+        Apply the rules of the plan to the matching fields in the JSON.
+
+        The rules of a node are applied to the matching field first, then the walk continues on the (possibly
+        replaced) field value with the children of the node. The walk is iterative: the stack holds the JSON
+        subtrees still to visit, together with the nodes matching their keys. All the elements of an array are
+        pushed at once, as the array itself.
+
+        :param target_json: target json as dictionary
+        :param deferred_fields: dictionary collecting, for each batchable PlanNode, the (container, key) of the
+                                matched fields instead of anonymizing them. None to anonymize them right away.
+        """
+        stack = [((target_json,), self.root.children)]
+        while stack:
+            json_subtrees, plan_nodes = stack.pop()
+            for current_json_subtree in json_subtrees:
+                if not current_json_subtree:
+                    # subtree is null or empty
+                    # we can't proceed further
+                    # since the element does not exist, skip it
+                    continue
+                for plan_node in plan_nodes:
+                    path_chunk = plan_node.path_chunk
+                    rules = plan_node.rules
+                    if path_chunk == ALL_ELEMENTS_IN_ARRAY_NOTATION and isinstance(
+                        current_json_subtree, list
+                    ):
+                        # apply rules to each element of the list
+                        if rules:
+                            if deferred_fields is not None and plan_node.batchable:
+                                fields = deferred_fields[plan_node]
+                                for i in range(len(current_json_subtree)):
+                                    fields.append((current_json_subtree, i))
+                                continue
+                            for i, list_item_value in enumerate(current_json_subtree):
+                                for rule in rules:
+                                    list_item_value = rule.function(
+                                        list_item_value, *rule.args
+                                    )
+                                current_json_subtree[i] = list_item_value
+                        if plan_node.children:
+                            stack.append((current_json_subtree, plan_node.children))
+                    elif path_chunk in current_json_subtree:
+                        # apply rules to the single item
+                        current_value = current_json_subtree[path_chunk]
+                        if rules:
+                            if deferred_fields is not None and plan_node.batchable:
+                                deferred_fields[plan_node].append(
+                                    (current_json_subtree, path_chunk)
+                                )
+                                continue
+                            for rule in rules:
+                                current_value = rule.function(current_value, *rule.args)
+                            current_json_subtree[path_chunk] = current_value
+                        if plan_node.children:
+                            stack.append(((current_value,), plan_node.children))
+
+    def apply(self, target_json):
+        """
+        Anonymize the json dictionary in place.
+
+        :param target_json: target json as dictionary
+        :return: the anonymized :target_json
+        """
+        self._apply_rules(target_json, None)
+        return target_json
+
+    def apply_many(self, target_jsons):
+        """
+        Anonymize the list of json dictionaries in place.
+
+        The fields whose operator has a batch variant are collected across all the json dictionaries and anonymized
+        with a single call of the batch operator per rule, after the traversal.
+
+        :param target_jsons: list of json dictionaries
+        :return: the anonymized :target_jsons
+        """
+        deferred_fields = collections.defaultdict(list)
+        for target_json in target_jsons:
+            self._apply_rules(target_json, deferred_fields)
+        self._apply_deferred(deferred_fields)
+        return target_jsons
+
+    @staticmethod
+    def _apply_deferred(deferred_fields):
+        """
+        Anonymize the deferred fields with a single call of the batch operator per rule.
+
+        :param deferred_fields: dictionary with the (container, key) of the fields collected for each PlanNode
+        """
+        for plan_node, fields in deferred_fields.items():
+            rule = plan_node.rules[0]
+            anonymized_values = rule.batch_function(
+                [container[key] for container, key in fields], *rule.args
+            )
+            for (container, key), anonymized_value in zip(fields, anonymized_values):
+                container[key] = anonymized_value
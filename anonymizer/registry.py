@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the definitions of the classes AnonymizerRegistry and SchemaDirectoryWatcher."""
+
+import collections
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from anonymizer import Anonymizer
+from anonymizer.exceptions import InitializationException
+
+DEFAULT_MAX_SIZE = 256
+DEFAULT_POLL_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def schema_content_hash(json_schema):
+    """
+    Return the hash of the content of :json_schema, independent of its formatting and of the order of its keys.
+
+    :param json_schema: json-schema dictionary
+    :return: hexadecimal SHA-256 digest
+    """
+    canonical_json_schema = json.dumps(
+        json_schema, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical_json_schema.encode("utf-8")).hexdigest()
+
+
+class AnonymizerRegistry:
+    """
+    AnonymizerRegistry maps the ids (and versions) of many json-schemas to the Anonymizer compiled from them.
+
+    Schemas are compiled lazily, the first time they are used, and the compiled Anonymizers are kept in a LRU cache
+    bounded by :max_size: the least recently used ones are dropped and compiled again if used later. Anonymizers are
+    cached by the content of the schema, so identical schemas registered with different ids are compiled once.
+    The registry can be shared across threads: json-schemas are compiled outside of its lock, so registering or
+    compiling a json-schema does not block the threads anonymizing with the Anonymizers already compiled.
+
+    Methods
+    -------
+    register(schema_id, json_schema, json_schema_str, version, precompile)
+        Register a json-schema, compiling it if precompile is True
+    unregister(schema_id, version)
+        Remove a json-schema from the registry
+    get(schema_id, version)
+        Return the Anonymizer of the json-schema, compiling it if needed
+    anonymize_json(schema_id, target_json, version)
+        Anonymize the json dictionary with the Anonymizer of the json-schema
+    cache_info()
+        Return the statistics of the cache of compiled Anonymizers
+    """
+
+    def __init__(
+        self,
+        encryption_secret=None,
+        encryption_cache_size=None,
+        json_backend=None,
+        max_size=DEFAULT_MAX_SIZE,
+    ):
+        """
+        Create the AnonymizerRegistry; the arguments are used to create each Anonymizer.
+
+        :param encryption_secret: secret used by the operation 'encrypt'
+        :param encryption_cache_size: max number of encrypted values cached by each Anonymizer, disabled if None or 0
+        :param json_backend: JSON library used by the Anonymizers, see Anonymizer
+        :param max_size: max number of compiled Anonymizers kept in memory
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive, got {}".format(max_size))
+        self.encryption_secret = encryption_secret
+        self.encryption_cache_size = encryption_cache_size
+        self.json_backend = json_backend
+        self.max_size = max_size
+        # (schema id, version): (content hash, json-schema dictionary)
+        self._schemas = {}
+        # schema id: version of the last json-schema registered with the id
+        self._latest_versions = {}
+        # content hash: compiled Anonymizer, from the least to the most recently used
+        self._anonymizers = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __contains__(self, schema_id):
+        return schema_id in self._latest_versions
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def register(
+        self,
+        schema_id,
+        json_schema=None,
+        json_schema_str=None,
+        version=None,
+        precompile=False,
+    ):
+        """
+        Register a json-schema, compiling it only if :precompile is True.
+
+        A json-schema registered again with the same id and version replaces the previous one: the Anonymizers
+        already returned by get keep anonymizing with the previous json-schema, the next calls to get return the
+        Anonymizer of the new one. With :precompile the new json-schema is compiled before replacing the previous
+        one, so that the next anonymizations do not wait for its compilation, and an invalid json-schema does not
+        replace the previous one.
+
+        :param schema_id: id of the json-schema, e.g. the name of the event type
+        :param json_schema: json-schema dictionary
+        :param json_schema_str: json schema as string
+        :param version: version of the json-schema, the last registered one is used when getting it without version
+        :param precompile: whether to compile the json-schema before registering it
+        :return: hash of the content of the json-schema
+        :raise InitializationException: if :precompile is True and the json-schema can not be compiled
+        """
+        if not json_schema and not json_schema_str:
+            raise InitializationException(
+                "You need to specify the schema using json_schema or json_schema_str params"
+            )
+        if not json_schema:
+            json_schema = json.loads(json_schema_str)
+        content_hash = schema_content_hash(json_schema)
+        anonymizer = None
+        if precompile:
+            with self._lock:
+                compiled = content_hash in self._anonymizers
+                if not compiled:
+                    self._misses += 1
+            if not compiled:
+                anonymizer = self._compile(json_schema)
+        with self._lock:
+            previous = self._schemas.get((schema_id, version))
+            self._schemas[(schema_id, version)] = (content_hash, json_schema)
+            self._latest_versions[schema_id] = version
+            if anonymizer is not None:
+                self._cache(content_hash, anonymizer)
+            if previous is not None:
+                self._drop_if_unused(previous[0])
+        return content_hash
+
+    def unregister(self, schema_id, version=None):
+        """
+        Remove a json-schema from the registry.
+
+        :param schema_id: id of the json-schema
+        :param version: version of the json-schema, the last registered one if None
+        :raise KeyError: if the json-schema is not registered
+        """
+        with self._lock:
+            key = self._key(schema_id, version)
+            content_hash, _ = self._schemas.pop(key)
+            if self._latest_versions[schema_id] == key[1]:
+                versions = [v for (i, v) in self._schemas if i == schema_id]
+                if versions:
+                    self._latest_versions[schema_id] = versions[-1]
+                else:
+                    del self._latest_versions[schema_id]
+            self._drop_if_unused(content_hash)
+
+    def _drop_if_unused(self, content_hash):
+        """Drop the compiled Anonymizer of :content_hash if no registered json-schema has that content."""
+        if all(h != content_hash for h, _ in self._schemas.values()):
+            self._anonymizers.pop(content_hash, None)
+
+    def _key(self, schema_id, version):
+        """Return the key of the registered json-schema, raise KeyError if it is not registered."""
+        if version is None:
+            if schema_id not in self._latest_versions:
+                raise KeyError("Unknown schema {!r}".format(schema_id))
+            version = self._latest_versions[schema_id]
+        key = (schema_id, version)
+        if key not in self._schemas:
+            raise KeyError(
+                "Unknown version {!r} of schema {!r}".format(version, schema_id)
+            )
+        return key
+
+    def _cache(self, content_hash, anonymizer):
+        """
+        Cache the compiled :anonymizer, unless another thread cached one for the same content meanwhile.
+
+        :return: the cached Anonymizer of :content_hash
+        """
+        cached_anonymizer = self._anonymizers.get(content_hash)
+        if cached_anonymizer is not None:
+            self._anonymizers.move_to_end(content_hash)
+            return cached_anonymizer
+        self._anonymizers[content_hash] = anonymizer
+        if len(self._anonymizers) > self.max_size:
+            self._anonymizers.popitem(last=False)
+        return anonymizer
+
+    def _compile(self, json_schema):
+        return Anonymizer(
+            json_schema=json_schema,
+            encryption_secret=self.encryption_secret,
+            encryption_cache_size=self.encryption_cache_size,
+            json_backend=self.json_backend,
+        )
+
+    def get(self, schema_id, version=None):
+        """
+        Return the Anonymizer of the json-schema, compiling it if needed.
+
+        :param schema_id: id of the json-schema
+        :param version: version of the json-schema, the last registered one if None
+        :return: Anonymizer
+        :raise KeyError: if the json-schema is not registered
+        :raise InitializationException: if the json-schema can not be compiled
+        """
+        with self._lock:
+            content_hash, json_schema = self._schemas[self._key(schema_id, version)]
+            anonymizer = self._anonymizers.get(content_hash)
+            if anonymizer is not None:
+                self._hits += 1
+                self._anonymizers.move_to_end(content_hash)
+                return anonymizer
+            self._misses += 1
+        # compiling outside of the lock, the other json-schemas can be used meanwhile
+        anonymizer = self._compile(json_schema)
+        with self._lock:
+            if all(h != content_hash for h, _ in self._schemas.values()):
+                # unregistered or replaced while compiling
+                return anonymizer
+            return self._cache(content_hash, anonymizer)
+
+    def anonymize_json(self, schema_id, target_json, version=None):
+        """
+        Anonymize the json dictionary with the Anonymizer of the json-schema.
+
+        :param schema_id: id of the json-schema
+        :param target_json: target json as dictionary
+        :param version: version of the json-schema, the last registered one if None
+        :return: dictionary representing the anonymized json
+        """
+        return self.get(schema_id, version).anonymize_json(target_json)
+
+    def cache_info(self):
+        """
+        Return the statistics of the cache of compiled Anonymizers.
+
+        :return: dictionary with the number of "hits" and "misses" (compilations), the "max_size" and the number of
+                 "compiled" Anonymizers and of "registered" json-schemas
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "max_size": self.max_size,
+                "compiled": len(self._anonymizers),
+                "registered": len(self._schemas),
+            }
+
+
+class SchemaDirectoryWatcher:
+    """
+    SchemaDirectoryWatcher keeps an AnonymizerRegistry in sync with the json-schema files of a directory.
+
+    Each file matching :pattern is registered with its name without extension as schema id, e.g. the json-schema of
+    "user_created.json" is registered as "user_created". The directory is polled: files whose modification time or
+    size changed are compiled and registered again, removed files are unregistered. The json-schemas are compiled
+    by the polling thread, before being registered, so the threads anonymizing records are not slowed down: records
+    being anonymized complete with the previous json-schema, the next ones use the new one. A file that can not be
+    loaded or compiled is logged and the previous json-schema is kept.
+
+    Methods
+    -------
+    poll()
+        Register the json-schema files added or changed since the last poll and unregister the removed ones
+    start()
+        Poll the directory now and then every poll_interval seconds, in a daemon thread
+    stop()
+        Stop polling the directory
+    """
+
+    def __init__(
+        self, registry, directory, pattern="*.json", poll_interval=DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Create the SchemaDirectoryWatcher, without polling the directory.
+
+        :param registry: AnonymizerRegistry the json-schemas are registered in
+        :param directory: path of the directory containing the json-schema files
+        :param pattern: glob pattern of the json-schema files in :directory
+        :param poll_interval: seconds between two polls of the directory
+        """
+        if poll_interval <= 0:
+            raise ValueError(
+                "poll_interval must be positive, got {}".format(poll_interval)
+            )
+        self.registry = registry
+        self.directory = directory
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        # schema id: (modification time in ns, size) of the file, when it was last loaded
+        self._file_signatures = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _load(self, schema_id, path):
+        """Compile and register the json-schema file :path, return whether it succeeded."""
+        try:
+            with open(path, encoding="utf-8") as schema_file:
+                json_schema_str = schema_file.read()
+            self.registry.register(
+                schema_id, json_schema_str=json_schema_str, precompile=True
+            )
+        except Exception:
+            # whatever is wrong with the file, the previous json-schema is kept and the watcher keeps running
+            logger.exception(
+                "Can not load the json-schema %s, keeping the previous one", path
+            )
+            return False
+        return True
+
+    def poll(self):
+        """
+        Register the json-schema files added or changed since the last poll and unregister the removed ones.
+
+        :return: list of the ids of the json-schemas registered or unregistered
+        """
+        changed_schema_ids = []
+        file_signatures = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, self.pattern))):
+            schema_id = os.path.splitext(os.path.basename(path))[0]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # removed since listed
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            file_signatures[schema_id] = signature
+            if self._file_signatures.get(schema_id) == signature:
+                continue
+            # the signature is stored even if loading fails, so that the file is not loaded again until it changes
+            if self._load(schema_id, path):
+                changed_schema_ids.append(schema_id)
+        for schema_id in self._file_signatures.keys() - file_signatures.keys():
+            try:
+                self.registry.unregister(schema_id)
+            except KeyError:
+                continue
+            changed_schema_ids.append(schema_id)
+        self._file_signatures = file_signatures
+        return changed_schema_ids
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Can not poll the directory %s", self.directory)
+
+    def start(self):
+        """Poll the directory now and then every poll_interval seconds, in a daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError("SchemaDirectoryWatcher already started")
+        self.poll()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="SchemaDirectoryWatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling the directory, waiting for the current poll to complete."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the functions to anonymize streams of newline-delimited JSON (NDJSON)."""
+
+import time
+
+from anonymizer.exceptions import RecordException
+
+ON_ERROR_FAIL = "fail"
+ON_ERROR_SKIP = "skip"
+ON_ERROR_DEAD_LETTER = "dead-letter"
+ON_ERROR_POLICIES = (ON_ERROR_FAIL, ON_ERROR_SKIP, ON_ERROR_DEAD_LETTER)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class StreamStatistics:
+    """
+    StreamStatistics collects the counters of an anonymized stream.
+
+    Attributes
+    ----------
+    records_read : int
+        number of non-empty lines read from the stream
+    records_written : int
+        number of anonymized records
+    records_failed : int
+        number of records that could not be anonymized (skipped or dead-lettered)
+    """
+
+    def __init__(self):
+        """Create the StreamStatistics, starting the clock."""
+        self.records_read = 0
+        self.records_written = 0
+        self.records_failed = 0
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def stop(self):
+        """Stop the clock."""
+        self.end_time = time.perf_counter()
+
+    @property
+    def elapsed_seconds(self):
+        """Seconds elapsed from the creation of the statistics until stop (or now, if not stopped)."""
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    @property
+    def records_per_second(self):
+        """Anonymized records per second."""
+        elapsed_seconds = self.elapsed_seconds
+        return self.records_written / elapsed_seconds if elapsed_seconds else 0.0
+
+
+def _serialize(json_codec, record):
+    """
+    Serialize :record to a NDJSON line.
+
+    :return: bytes of the JSON representation of :record, newline terminated
+    """
+    return json_codec.dumps(record) + b"\n"
+
+
+def _anonymize_lines(anonymizer, lines):
+    """
+    Anonymize a batch of NDJSON lines.
+
+    The whole batch is anonymized with a single anonymize_many call. If that fails, the lines are anonymized one by
+    one (parsing them again from the raw line) to find out which ones are failing.
+
+    :param anonymizer: Anonymizer used to anonymize each record
+    :param lines: list of raw lines
+    :return: tuple (list of the anonymized lines as bytes, list of tuples (index of the failing line, error message))
+    """
+    json_codec = anonymizer.json_codec
+    try:
+        records = anonymizer.anonymize_many_str(lines)
+        return [_serialize(json_codec, record) for record in records], []
+    except Exception:
+        pass
+    anonymized_lines = []
+    failures = []
+    for index, line in enumerate(lines):
+        try:
+            anonymized_lines.append(
+                _serialize(json_codec, anonymizer.anonymize_json_str(line))
+            )
+        except Exception as e:
+            failures.append((index, repr(e)))
+    return anonymized_lines, failures
+
+
+def _handle_failures(
+    failures, line_numbers, lines, on_error, dead_letter_file, statistics
+):
+    """
+    Apply the error policy :on_error to the failing lines of a batch.
+
+    :param failures: list of tuples (index of the failing line, error message)
+    :param line_numbers: line numbers of the lines of the batch
+    :param lines: raw lines of the batch
+    :raise RecordException: for the first failing line, if :on_error is "fail"
+    """
+    for index, error_message in failures:
+        if on_error == ON_ERROR_FAIL:
+            raise RecordException(line_numbers[index], error_message)
+        statistics.records_failed += 1
+        if on_error == ON_ERROR_DEAD_LETTER:
+            line = lines[index]
+            dead_letter_file.write(line if line.endswith(b"\n") else line + b"\n")
+
+
+def _validate_error_policy(on_error, dead_letter_file):
+    """Raise ValueError if :on_error is not a known error policy or misses the :dead_letter_file."""
+    if on_error not in ON_ERROR_POLICIES:
+        raise ValueError(
+            "on_error must be one of {}, got {!r}".format(ON_ERROR_POLICIES, on_error)
+        )
+    if on_error == ON_ERROR_DEAD_LETTER and dead_letter_file is None:
+        raise ValueError("on_error='dead-letter' requires a dead_letter_file")
+
+
+def _batches(lines, batch_size, statistics):
+    """
+    Group the non-empty :lines in batches of :batch_size.
+
+    :return: generator of tuples (line numbers, raw lines)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive, got {}".format(batch_size))
+    line_numbers = []
+    batch = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        statistics.records_read += 1
+        line_numbers.append(line_number)
+        batch.append(line)
+        if len(batch) == batch_size:
+            yield line_numbers, batch
+            line_numbers = []
+            batch = []
+    if batch:
+        yield line_numbers, batch
+
+
+def anonymize_ndjson(
+    anonymizer,
+    lines,
+    batch_size=DEFAULT_BATCH_SIZE,
+    on_error=ON_ERROR_FAIL,
+    dead_letter_file=None,
+    statistics=None,
+):
+    """
+    Anonymize a stream of NDJSON lines, yielding the anonymized lines.
+
+    Lines are anonymized in batches of :batch_size, so the memory used does not depend on the stream length.
+    Empty lines are ignored.
+
+    :param anonymizer: Anonymizer used to anonymize each record
+    :param lines: iterable of NDJSON lines as bytes (e.g. a file opened in binary mode)
+    :param batch_size: number of lines anonymized together
+    :param on_error: what to do with a record that can not be anonymized:
+        - "fail": raise a RecordException
+        - "skip": drop the record
+        - "dead-letter": write the raw line to :dead_letter_file
+    :param dead_letter_file: binary file object receiving the failing lines, required by "dead-letter"
+    :param statistics: optional StreamStatistics updated while consuming the stream
+    :return: generator of the anonymized NDJSON lines, as newline terminated bytes
+    """
+    _validate_error_policy(on_error, dead_letter_file)
+    if statistics is None:
+        statistics = StreamStatistics()
+
+    for line_numbers, batch in _batches(lines, batch_size, statistics):
+        anonymized_lines, failures = _anonymize_lines(anonymizer, batch)
+        _handle_failures(
+            failures, line_numbers, batch, on_error, dead_letter_file, statistics
+        )
+        statistics.records_written += len(anonymized_lines)
+        yield from anonymized_lines
+    statistics.stop()
+
+
+def anonymize_ndjson_file(
+    anonymizer,
+    input_file,
+    output_file,
+    batch_size=DEFAULT_BATCH_SIZE,
+    on_error=ON_ERROR_FAIL,
+    dead_letter_file=None,
+):
+    """
+    Anonymize the NDJSON :input_file writing the anonymized records to :output_file.
+
+    :param anonymizer: Anonymizer used to anonymize each record
+    :param input_file: binary file object to read the NDJSON lines from
+    :param output_file: binary file object to write the anonymized NDJSON lines to
+    :param batch_size: number of lines anonymized together
+    :param on_error: error policy, see anonymize_ndjson
+    :param dead_letter_file: binary file object receiving the failing lines, required by "dead-letter"
+    :return: StreamStatistics of the anonymized stream
+    """
+    statistics = StreamStatistics()
+    output_file.writelines(
+        anonymize_ndjson(
+            anonymizer,
+            input_file,
+            batch_size=batch_size,
+            on_error=on_error,
+            dead_letter_file=dead_letter_file,
+            statistics=statistics,
+        )
+    )
+    output_file.flush()
+    return statistics
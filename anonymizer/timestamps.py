@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the integer arithmetic and the cache used to truncate POSIX timestamps to the month."""
+
+import math
+import operator
+
+SECONDS_PER_DAY = 86400
+# POSIX timestamps of 0001-01-01T00:00:00 and 9999-12-31T23:59:59, the range of datetime
+MIN_POSIX_TIMESTAMP = -62135596800
+MAX_POSIX_TIMESTAMP = 253402300799
+# min number of timestamps for which truncate_to_month_many uses numpy, below it the conversion costs more
+NUMPY_MIN_BATCH_SIZE = 64
+# number of months kept by a MonthBucketCache
+DEFAULT_MONTH_BUCKETS = 4
+
+# numpy module, False if it is not installed, None until first use
+_numpy = None
+
+
+def _import_numpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy
+
+
+def days_from_civil(year, month, day):
+    """
+    Return the number of days from 1970-01-01 to the date of the proleptic Gregorian calendar.
+
+    See http://howardhinnant.github.io/date_algorithms.html#days_from_civil
+
+    :return: integer, negative for dates before 1970-01-01
+    """
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def civil_from_days(days):
+    """
+    Return the date of the proleptic Gregorian calendar :days days after 1970-01-01.
+
+    See http://howardhinnant.github.io/date_algorithms.html#civil_from_days
+
+    :return: tuple (year, month, day)
+    """
+    days += 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (
+        day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+    ) // 365
+    day_of_year = day_of_era - (
+        365 * year_of_era + year_of_era // 4 - year_of_era // 100
+    )
+    # month starting from March
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = shifted_month + 3 if shifted_month < 10 else shifted_month - 9
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def truncate_to_month(posix_timestamp):
+    """
+    Return the POSIX timestamp of the first of the month of :posix_timestamp, at midnight UTC.
+
+    The day of the month is computed as in civil_from_days, without computing the year and month, so this works on
+    integers as well as on numpy arrays of integers.
+
+    :param posix_timestamp: integer seconds since 1970-01-01 (or numpy array of them)
+    :return: integer seconds since 1970-01-01 (or numpy array of them)
+    """
+    days = posix_timestamp // SECONDS_PER_DAY
+    day_of_era = (days + 719468) % 146097
+    year_of_era = (
+        day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+    ) // 365
+    day_of_year = day_of_era - (
+        365 * year_of_era + year_of_era // 4 - year_of_era // 100
+    )
+    # days since the first of the month
+    day_of_month = day_of_year - (153 * ((5 * day_of_year + 2) // 153) + 2) // 5
+    return (days - day_of_month) * SECONDS_PER_DAY
+
+
+def truncate_to_month_many(posix_timestamps):
+    """
+    Apply truncate_to_month to each POSIX timestamp of the list, vectorized with numpy if it is installed.
+
+    :param posix_timestamps: list of integer seconds since 1970-01-01 or None
+    :return: list of integer seconds since 1970-01-01, None where the input is None
+    """
+    numpy = _import_numpy()
+    valid_posix_timestamps = [
+        posix_timestamp
+        for posix_timestamp in posix_timestamps
+        if posix_timestamp is not None
+    ]
+    if not numpy or len(valid_posix_timestamps) < NUMPY_MIN_BATCH_SIZE:
+        return [
+            None if posix_timestamp is None else truncate_to_month(posix_timestamp)
+            for posix_timestamp in posix_timestamps
+        ]
+    truncated = iter(
+        truncate_to_month(
+            numpy.array(valid_posix_timestamps, dtype=numpy.int64)
+        ).tolist()
+    )
+    return [
+        None if posix_timestamp is None else next(truncated)
+        for posix_timestamp in posix_timestamps
+    ]
+
+
+def posix_seconds(posix_timestamp):
+    """
+    Return the whole seconds of :posix_timestamp, as datetime.datetime.fromtimestamp sees them.
+
+    Floats are rounded to the microsecond (half to even) before being truncated to the second, like datetime does.
+
+    :param posix_timestamp: seconds since 1970-01-01, integer (or object with __index__) or float
+    :return: integer, None if :posix_timestamp is not a valid timestamp or out of the range of datetime
+    """
+    if isinstance(posix_timestamp, float):
+        if not math.isfinite(posix_timestamp):
+            return None
+        fraction, seconds = math.modf(posix_timestamp)
+        microseconds = round(fraction * 1e6)
+        seconds = int(seconds)
+        if microseconds >= 1000000:
+            seconds += 1
+        elif microseconds < 0:
+            seconds -= 1
+    else:
+        try:
+            seconds = operator.index(posix_timestamp)
+        except TypeError:
+            return None
+    if MIN_POSIX_TIMESTAMP <= seconds <= MAX_POSIX_TIMESTAMP:
+        return seconds
+    return None
+
+
+def posix_seconds_from_milliseconds(milliseconds_since_epoch):
+    """
+    Return the whole seconds of :milliseconds_since_epoch, as datetime.datetime.fromtimestamp sees them.
+
+    :param milliseconds_since_epoch: milliseconds since 1970-01-01, integer (or object with __index__) or float
+    :return: integer, None if :milliseconds_since_epoch is not a valid timestamp or out of the range of datetime
+    """
+    if isinstance(milliseconds_since_epoch, float):
+        return posix_seconds(milliseconds_since_epoch / 1000)
+    try:
+        # integer division, dividing large integers by 1000 as float could overflow
+        seconds = operator.index(milliseconds_since_epoch) // 1000
+    except TypeError:
+        return None
+    if MIN_POSIX_TIMESTAMP <= seconds <= MAX_POSIX_TIMESTAMP:
+        return seconds
+    return None
+
+
+class MonthBucketCache:
+    """
+    MonthBucketCache keeps the most recently seen months, to truncate the timestamps falling in them with two
+    comparisons.
+
+    Each bucket is the range [month_start, next_month_start) of timestamps in the unit of the cache (e.g. seconds
+    or milliseconds), the most recently used first. Timestamps of events cluster in a few months, so most lookups
+    hit the first bucket.
+
+    Attributes
+    ----------
+    scale : int
+        number of units of the cached timestamps in a second, e.g. 1000 for milliseconds
+    size : int
+        max number of cached months
+    hits : int
+        number of lookups of timestamps found in a cached month
+    misses : int
+        number of lookups of timestamps not found
+
+    Methods
+    -------
+    get(timestamp)
+        Return the start of the cached month of :timestamp, None if not cached
+    add(month_start)
+        Cache the month starting at the POSIX timestamp :month_start
+    info()
+        Return the counters of the cache
+    reset_counters()
+        Reset the hits and misses
+    """
+
+    __slots__ = ("scale", "size", "buckets", "hits", "misses")
+
+    def __init__(self, scale=1, size=DEFAULT_MONTH_BUCKETS):
+        """
+        Create the empty MonthBucketCache.
+
+        :param scale: number of units of the cached timestamps in a second, e.g. 1000 for milliseconds
+        :param size: max number of cached months
+        """
+        if size < 1:
+            raise ValueError("size must be positive, got {}".format(size))
+        self.scale = scale
+        self.size = size
+        # (month start, next month start) in the unit of the cache, from the most to the least recently used;
+        # a tuple replaced on update, so that threads sharing the cache always see a consistent one
+        self.buckets = ()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, timestamp):
+        """
+        Return the start of the cached month of :timestamp, None if not cached.
+
+        :param timestamp: integer timestamp in the unit of the cache
+        :return: integer timestamp in the unit of the cache
+        """
+        buckets = self.buckets
+        if buckets:
+            month_start, next_month_start = buckets[0]
+            if month_start <= timestamp < next_month_start:
+                self.hits += 1
+                return month_start
+        for index in range(1, len(buckets)):
+            month_start, next_month_start = bucket = buckets[index]
+            if month_start <= timestamp < next_month_start:
+                self.hits += 1
+                self.buckets = (bucket,) + buckets[:index] + buckets[index + 1 :]
+                return month_start
+        self.misses += 1
+        return None
+
+    def add(self, month_start):
+        """
+        Cache the month starting at the POSIX timestamp :month_start, dropping the least recently used one if full.
+
+        :param month_start: integer seconds since 1970-01-01 of the first of the month, see truncate_to_month
+        :return: :month_start in the unit of the cache
+        """
+        # the next month starts between 28 and 31 days later
+        next_month_start = truncate_to_month(month_start + 31 * SECONDS_PER_DAY)
+        bucket = (month_start * self.scale, next_month_start * self.scale)
+        buckets = self.buckets
+        if bucket not in buckets:
+            self.buckets = ((bucket,) + buckets)[: self.size]
+        return bucket[0]
+
+    def info(self):
+        """
+        Return the counters of the cache.
+
+        :return: dictionary with the number of "hits" and "misses", the max "size" and the number of "cached" months
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "cached": len(self.buckets),
+        }
+
+    def reset_counters(self):
+        """Reset the hits and misses, keeping the cached months."""
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the Anonymizer on synthetic records: python -m benchmarks.run --help."""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from anonymizer import Anonymizer
+from benchmarks.scenarios import SCENARIOS
+
+ENCRYPTION_SECRET = "benchmark-secret"
+ENTRY_POINTS = ("anonymize_json", "anonymize_json_str")
+DEFAULT_RECORDS = 2000
+DEFAULT_SEED = 42
+WARMUP_RECORDS = 100
+
+
+def _percentile(sorted_values, percentile):
+    """Return the :percentile (0-100) of :sorted_values, by nearest rank."""
+    index = max(0, int(round(percentile / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _targets(entry_point, payloads):
+    """Return the arguments of :entry_point for each payload, parsed for anonymize_json (which works in place)."""
+    if entry_point == "anonymize_json":
+        return [json.loads(payload) for payload in payloads]
+    return list(payloads)
+
+
+def run_benchmark(scenario, entry_point, records, seed, json_backend=None):
+    """
+    Benchmark :entry_point of the Anonymizer on :records synthetic records of :scenario.
+
+    :return: dictionary with the records/sec, the p50/p99 latency per record in microseconds and the peak memory
+             allocated while anonymizing the records in bytes
+    """
+    json_schema, generate = SCENARIOS[scenario]
+    rng = random.Random(seed)
+    payloads = [json.dumps(generate(rng)) for _ in range(records)]
+    anonymizer = Anonymizer(
+        json_schema=json_schema,
+        encryption_secret=ENCRYPTION_SECRET,
+        json_backend=json_backend,
+    )
+    anonymize = getattr(anonymizer, entry_point)
+    for target in _targets(entry_point, payloads[:WARMUP_RECORDS]):
+        anonymize(target)
+
+    perf_counter_ns = time.perf_counter_ns
+    latencies_ns = []
+    targets = _targets(entry_point, payloads)
+    start = perf_counter_ns()
+    for target in targets:
+        record_start = perf_counter_ns()
+        anonymize(target)
+        latencies_ns.append(perf_counter_ns() - record_start)
+    elapsed_ns = perf_counter_ns() - start
+
+    # tracing slows down the anonymization, so memory is measured by a separate run
+    targets = _targets(entry_point, payloads)
+    tracemalloc.start()
+    try:
+        for target in targets:
+            anonymize(target)
+        peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies_ns.sort()
+    return {
+        "scenario": scenario,
+        "entry_point": entry_point,
+        "records": records,
+        "payload_bytes": sum(len(payload) for payload in payloads) // records,
+        "records_per_second": records / (elapsed_ns / 1e9),
+        "p50_us": _percentile(latencies_ns, 50) / 1e3,
+        "p99_us": _percentile(latencies_ns, 99) / 1e3,
+        "peak_memory_bytes": peak_memory_bytes,
+    }
+
+
+def compare(results, baseline):
+    """
+    Compare :results with the :baseline results of a previous run.
+
+    :return: list of lines, one per benchmark found in both, with the speedup of the records/sec and p99 latency
+    """
+    baseline_results = {
+        (result["scenario"], result["entry_point"]): result
+        for result in baseline["results"]
+    }
+    lines = []
+    for result in results["results"]:
+        baseline_result = baseline_results.get(
+            (result["scenario"], result["entry_point"])
+        )
+        if baseline_result is None:
+            continue
+        lines.append(
+            "{:<26} {:<20} records/sec x{:.2f}  p99 x{:.2f}".format(
+                result["scenario"],
+                result["entry_point"],
+                result["records_per_second"] / baseline_result["records_per_second"],
+                baseline_result["p99_us"] / result["p99_us"],
+            )
+        )
+    return lines
+
+
+def main(argv=None):
+    """
+    Run the benchmarks, writing the results as JSON.
+
+    :param argv: command line arguments, sys.argv[1:] if None
+    :return: exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the Anonymizer on synthetic records.",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run, can be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--entry-point",
+        action="append",
+        choices=ENTRY_POINTS,
+        help="Anonymizer method to benchmark, can be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--records",
+        type=int,
+        default=DEFAULT_RECORDS,
+        help="number of records per benchmark (default: {})".format(DEFAULT_RECORDS),
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="seed of the record generators (default: {})".format(DEFAULT_SEED),
+    )
+    parser.add_argument("--json-backend", help="JSON backend of the Anonymizer")
+    parser.add_argument(
+        "-o", "--output", help="file to write the JSON results to (default: stdout)"
+    )
+    parser.add_argument(
+        "--compare", help="JSON results of a previous run to compare with, on stderr"
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": Anonymizer(
+            json_schema={"type": "object"}, json_backend=args.json_backend
+        ).json_codec.name,
+        "seed": args.seed,
+        "results": [],
+    }
+    for scenario in args.scenario or sorted(SCENARIOS):
+        for entry_point in args.entry_point or ENTRY_POINTS:
+            result = run_benchmark(
+                scenario, entry_point, args.records, args.seed, args.json_backend
+            )
+            results["results"].append(result)
+            print(
+                "{scenario:<26} {entry_point:<20} {records_per_second:>10.0f} records/sec  "
+                "p50 {p50_us:>8.1f}us  p99 {p99_us:>8.1f}us  "
+                "peak {peak_memory_bytes:>10} bytes".format(**result),
+                file=sys.stderr,
+            )
+
+    results_str = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(results_str + "\n")
+    else:
+        print(results_str)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print("\n".join(compare(results, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+
+"""Python script containing the json-schemas and the payload generators of the benchmark scenarios."""
+
+import json
+
+
+def _object(**properties):
+    return {"type": ["object", "null"], "properties": properties}
+
+
+def _array(items):
+    return {"type": ["array", "null"], "items": items}
+
+
+def _field(field_type, operation=None, *args):
+    field = {"type": [field_type, "null"]}
+    if operation is not None:
+        field["x-anonymize-operation"] = operation
+    if args:
+        field["x-anonymize-args"] = list(args)
+    return field
+
+
+def _schema(**properties):
+    schema = _object(**properties)
+    schema["$schema"] = "http://json-schema.org/draft-07/schema#"
+    return schema
+
+
+def _id(rng):
+    return "{:08x}-{:04x}-4{:03x}-a{:03x}-{:012x}".format(
+        rng.getrandbits(32),
+        rng.getrandbits(16),
+        rng.getrandbits(12),
+        rng.getrandbits(12),
+        rng.getrandbits(48),
+    )
+
+
+def _epoch_milliseconds(rng):
+    return rng.randrange(1262304000000, 1735689600000)
+
+
+USER_SCHEMA = _schema(
+    data=_object(
+        id=_field("string", "encrypt"),
+        type=_field("string"),
+        attributes=_object(
+            first_name=_field("string", "put_to_null"),
+            last_name=_field("string", "put_to_null"),
+            email=_field(
+                "string", "is_email_present_or_test", ["example.com", "test.com"]
+            ),
+            birthday=_field("string", "truncate_day_from_str", "%Y-%m-%d"),
+            created_at=_field("integer", "truncate_day_from_epoch_milliseconds"),
+            last_ip=_field("string", "round_ip"),
+            height=_field("number", "round_float", 1),
+            country=_field("string"),
+        ),
+    )
+)
+
+
+def generate_user(rng):
+    return {
+        "data": {
+            "id": _id(rng),
+            "type": "user",
+            "attributes": {
+                "first_name": rng.choice(["Anna", "Jakob", "Lena", "Paul", None]),
+                "last_name": rng.choice(["Huber", "Gruber", "Wagner", "Bauer"]),
+                "email": rng.choice(
+                    [
+                        "user{}@runtastic.com".format(rng.randrange(10**6)),
+                        "qa{}@test.com".format(rng.randrange(100)),
+                        "invalid-email",
+                        None,
+                    ]
+                ),
+                "birthday": "{:04}-{:02}-{:02}".format(
+                    rng.randrange(1950, 2010),
+                    rng.randrange(1, 13),
+                    rng.randrange(1, 29),
+                ),
+                "created_at": _epoch_milliseconds(rng),
+                "last_ip": "{}.{}.{}.{}".format(
+                    *(rng.randrange(256) for _ in range(4))
+                ),
+                "height": rng.uniform(1.5, 2.1),
+                "country": rng.choice(["AT", "DE", "US", "JP"]),
+            },
+        }
+    }
+
+
+GROUP_SCHEMA = _schema(
+    data=_object(
+        id=_field("string"),
+        relationships=_object(
+            members=_object(
+                data=_array(
+                    _object(id=_field("string", "encrypt"), type=_field("string"))
+                )
+            )
+        ),
+    ),
+    included=_array(
+        dict(
+            _object(
+                attributes=_object(
+                    name=_field("string"), member_count=_field("integer")
+                ),
+                type=_field("string"),
+            ),
+            **{
+                "x-anonymize-operation": "conditional_operation",
+                "x-anonymize-args": [
+                    {
+                        "function": "put_to_null",
+                        "target_field": "attributes.name",
+                        "conditional_fields": ["type", "attributes.member_count"],
+                        "conditional_values": ["random_group", 5000],
+                        "conditional_field_values_when_null": [None, 0],
+                        "conditional_operators": ["!=", "<"],
+                        "conditional_boolean_function": "or",
+                    }
+                ],
+            }
+        )
+    ),
+)
+
+
+def generate_group(rng):
+    return {
+        "data": {
+            "id": _id(rng),
+            "relationships": {
+                "members": {
+                    "data": [
+                        {"id": _id(rng), "type": "user"}
+                        for _ in range(rng.randrange(1, 30))
+                    ]
+                }
+            },
+        },
+        "included": [
+            {
+                "type": rng.choice(["random_group", "adidas_group", None]),
+                "attributes": {
+                    "name": "Group {}".format(rng.randrange(1000)),
+                    "member_count": rng.choice([None, rng.randrange(20000)]),
+                },
+            }
+            for _ in range(rng.randrange(1, 5))
+        ],
+    }
+
+
+SPORT_ACTIVITY_SCHEMA = _schema(
+    data=_object(
+        id=_field("string"),
+        attributes=_object(
+            user_id=_field("string", "encrypt"),
+            start_time=_field("integer", "truncate_day_from_epoch_milliseconds"),
+            end_time=_field("integer", "truncate_day_from_epoch_milliseconds"),
+            notes=_field("string", "put_to_null"),
+            trace=_array(
+                _object(
+                    lat=_field("number", "round_float", 2),
+                    lng=_field("number", "round_float", 2),
+                    elevation=_field("number", "round_float_to_integer"),
+                    timestamp=_field("integer"),
+                )
+            ),
+            laps=_array(
+                _object(
+                    splits=_array(
+                        _object(
+                            duration=_field("integer"),
+                            location=_object(
+                                lat=_field("number", "round_float", 2),
+                                lng=_field("number", "round_float", 2),
+                            ),
+                        )
+                    )
+                )
+            ),
+        ),
+    )
+)
+
+
+def generate_sport_activity(rng):
+    start_time = _epoch_milliseconds(rng)
+    lat, lng = rng.uniform(-60, 60), rng.uniform(-180, 180)
+    trace = []
+    for i in range(rng.randrange(50, 500)):
+        lat += rng.uniform(-0.0005, 0.0005)
+        lng += rng.uniform(-0.0005, 0.0005)
+        trace.append(
+            {
+                "lat": lat,
+                "lng": lng,
+                "elevation": rng.uniform(100, 2000),
+                "timestamp": start_time + i * 1000,
+            }
+        )
+    return {
+        "data": {
+            "id": _id(rng),
+            "attributes": {
+                "user_id": _id(rng),
+                "start_time": start_time,
+                "end_time": start_time + len(trace) * 1000,
+                "notes": rng.choice([None, "Morning run along the river"]),
+                "trace": trace,
+                "laps": [
+                    {
+                        "splits": [
+                            {
+                                "duration": rng.randrange(200000, 400000),
+                                "location": {
+                                    "lat": point["lat"],
+                                    "lng": point["lng"],
+                                },
+                            }
+                            for point in trace[:: max(1, len(trace) // 10)]
+                        ]
+                    }
+                    for _ in range(rng.randrange(1, 4))
+                ],
+            },
+        }
+    }
+
+
+_NOT_CONTENT_PROVIDER = {
+    "conditional_fields": "relationships.owner.data.type",
+    "conditional_field_values_when_null": None,
+    "conditional_values": "content_provider",
+    "conditional_operators": "!=",
+}
+
+WORKOUT_SCHEMA = _schema(
+    included=_array(
+        dict(
+            _object(
+                attributes=_object(
+                    name=_field("string"),
+                    description=_field("string"),
+                    short_description=_field("string"),
+                ),
+                relationships=_object(
+                    owner=_object(
+                        data=dict(
+                            _object(id=_field("string"), type=_field("string")),
+                            **{
+                                "x-anonymize-operation": "conditional_operation",
+                                "x-anonymize-args": [
+                                    dict(
+                                        _NOT_CONTENT_PROVIDER,
+                                        function="encrypt",
+                                        target_field="id",
+                                        conditional_fields="type",
+                                    )
+                                ],
+                            }
+                        )
+                    )
+                ),
+            ),
+            **{
+                "x-anonymize-operation": "conditional_operation",
+                "x-anonymize-args": [
+                    [
+                        dict(
+                            _NOT_CONTENT_PROVIDER,
+                            function="put_to_null",
+                            target_field="attributes." + target_field,
+                        )
+                        for target_field in ("description", "short_description", "name")
+                    ]
+                ],
+            }
+        )
+    )
+)
+
+
+def generate_workout(rng):
+    return {
+        "included": [
+            {
+                "attributes": {
+                    "name": "Workout {}".format(rng.randrange(1000)),
+                    "description": "Full body workout",
+                    "short_description": "Full body",
+                },
+                "relationships": {
+                    "owner": {
+                        "data": {
+                            "id": _id(rng),
+                            "type": rng.choice(["user", "content_provider"]),
+                        }
+                    }
+                },
+            }
+            for _ in range(rng.randrange(1, 10))
+        ]
+    }
+
+
+SPLIT_AND_JOIN_SCHEMA = _schema(
+    friend_ids=_field(
+        "string",
+        "split_anonymize_and_join",
+        {"separator": ";", "function": "encrypt"},
+    ),
+    ips=_field(
+        "string",
+        "split_anonymize_and_join",
+        {"separator": ",", "function": "round_ip"},
+    ),
+    distances=_field(
+        "string",
+        "split_anonymize_and_join",
+        {
+            "separator": ";",
+            "function": "round_float",
+            "function_args": [1],
+            "cast_element_to": "float",
+        },
+    ),
+)
+
+
+def generate_split_and_join(rng):
+    return {
+        "friend_ids": ";".join(
+            str(rng.randrange(10**9)) for _ in range(rng.randrange(1, 20))
+        ),
+        "ips": ",".join(
+            "{}.{}.{}.{}".format(*(rng.randrange(256) for _ in range(4)))
+            for _ in range(rng.randrange(1, 5))
+        ),
+        "distances": ";".join(
+            str(rng.uniform(0, 42.195)) for _ in range(rng.randrange(1, 10))
+        ),
+    }
+
+
+EMBEDDED_JSON_SCHEMA = _schema(
+    event=_object(
+        id=_field("string"),
+        payload=_field(
+            "string",
+            "apply_function_on_field_in_json_string",
+            {
+                "target_field": "url",
+                "function": "replace_regex_matches_with_string",
+                "function_args": [
+                    "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+                    "anonymized",
+                ],
+            },
+        ),
+        metadata=_field("object", "serialize_to_json_string"),
+    )
+)
+
+
+def generate_embedded_json(rng):
+    return {
+        "event": {
+            "id": _id(rng),
+            "payload": json.dumps(
+                {
+                    "url": "https://www.runtastic.com/en/users/{}/sport-sessions/{}".format(
+                        _id(rng), rng.randrange(10**6)
+                    ),
+                    "referrer": "https://www.runtastic.com/",
+                }
+            ),
+            "metadata": {
+                "app_version": "{}.{}".format(rng.randrange(10), rng.randrange(10)),
+                "platform": rng.choice(["android", "ios", "web"]),
+            },
+        }
+    }
+
+
+# name of the scenario: (json-schema, function generating a record from a random.Random)
+SCENARIOS = {
+    "user": (USER_SCHEMA, generate_user),
+    "group": (GROUP_SCHEMA, generate_group),
+    "sport_activity": (SPORT_ACTIVITY_SCHEMA, generate_sport_activity),
+    "workout_conditional": (WORKOUT_SCHEMA, generate_workout),
+    "split_anonymize_and_join": (SPLIT_AND_JOIN_SCHEMA, generate_split_and_join),
+    "embedded_json": (EMBEDDED_JSON_SCHEMA, generate_embedded_json),
+}
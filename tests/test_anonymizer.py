@@ -2620,6 +2620,487 @@ class AnonymizerTestCase(unittest.TestCase):
         anonymized_json = anonymizer.anonymize_json_str(test_json_str)
         self.assertEqual(expected_json, anonymized_json)
 
+    def test_shared_prefix_paths_function_application(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "data": {
+              "type": "object",
+              "properties": {
+                "attributes": {
+                  "type": "object",
+                  "properties": {
+                    "ip": {
+                      "type": "string",
+                      "x-anonymize-operation": "round_ip"
+                    },
+                    "lat": {
+                      "type": "number",
+                      "x-anonymize-operation": "round_float",
+                      "x-anonymize-args": [1]
+                    },
+                    "splits": {
+                      "type": "array",
+                      "x-anonymize-operation": "put_to_null",
+                      "items": {
+                        "type": "object",
+                        "properties": {
+                          "distance": {
+                            "type": "number",
+                            "x-anonymize-operation": "round_float_to_integer"
+                          }
+                        }
+                      }
+                    },
+                    "laps": {
+                      "type": "array",
+                      "items": {
+                        "type": "object",
+                        "properties": {
+                          "distance": {
+                            "type": "number",
+                            "x-anonymize-operation": "round_float_to_integer"
+                          },
+                          "duration": {
+                            "type": "number",
+                            "x-anonymize-operation": "put_to_null"
+                          }
+                        }
+                      }
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+        """
+
+        test_json_str = """
+            {
+              "data": {
+                "attributes": {
+                  "ip": "192.168.1.1",
+                  "lat": 47.2346,
+                  "splits": [{"distance": 1000.3}],
+                  "laps": [
+                    {"distance": 1000.3, "duration": 300},
+                    {"distance": 999.7}
+                  ]
+                }
+              }
+            }
+        """
+
+        expected_json = json.loads(
+            """
+            {
+              "data": {
+                "attributes": {
+                  "ip": "192.168.0.0",
+                  "lat": 47.2,
+                  "splits": null,
+                  "laps": [
+                    {"distance": 1000, "duration": null},
+                    {"distance": 1000}
+                  ]
+                }
+              }
+            }
+        """
+        )
+
+        anonymizer = Anonymizer(json_schema_str=schema_str)
+        anonymized_json = anonymizer.anonymize_json_str(test_json_str)
+        self.assertEqual(expected_json, anonymized_json)
+
+    def test_unknown_operation_instantiation_fail(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "user": {
+              "type": "object",
+              "properties": {
+                "id": {
+                  "type": "integer",
+                  "x-anonymize-operation": "put_to_nul"
+                }
+              }
+            }
+          }
+        }
+        """
+        with self.assertRaises(InitializationException) as context:
+            Anonymizer(json_schema_str=schema_str)
+        self.assertIn("put_to_nul", str(context.exception))
+        self.assertIn("user/id", str(context.exception))
+
+    def test_anonymize_many(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "user": {
+              "type": "object",
+              "properties": {
+                "id": {
+                  "type": "integer",
+                  "x-anonymize-operation": "encrypt"
+                },
+                "name": {
+                  "type": "string",
+                  "x-anonymize-operation": "put_to_null"
+                }
+              }
+            },
+            "sessions": {
+              "type": "array",
+              "items": {
+                  "type": "object",
+                  "properties": {
+                    "start_time": {
+                      "type": "integer",
+                      "x-anonymize-operation": "truncate_day_from_epoch_milliseconds"
+                    },
+                    "friend_ids": {
+                      "type": "array",
+                      "items": {
+                        "type": "string",
+                        "x-anonymize-operation": "encrypt"
+                      }
+                    }
+                  }
+              }
+            }
+          }
+        }
+        """
+
+        test_json_strs = [
+            """
+            {
+              "user": {"id": 1234567, "name": "Markus"},
+              "sessions": [
+                {"start_time": 1588381200000, "friend_ids": ["1234567", null]},
+                {"start_time": null, "friend_ids": []}
+              ]
+            }
+            """,
+            """{"user": null}""",
+            """
+            {
+              "user": {"id": null, "name": "Anna"},
+              "sessions": [{"start_time": -146534400000}]
+            }
+            """,
+        ]
+
+        expected_jsons = [
+            {
+                "user": {"id": "Zh7hpRitlY7ANahH3RDk7w==", "name": None},
+                "sessions": [
+                    {
+                        "start_time": 1588291200000,
+                        "friend_ids": ["Zh7hpRitlY7ANahH3RDk7w==", None],
+                    },
+                    {"start_time": None, "friend_ids": []},
+                ],
+            },
+            {"user": None},
+            {
+                "user": {"id": None, "name": None},
+                "sessions": [{"start_time": -147398400000}],
+            },
+        ]
+
+        anonymizer = Anonymizer(json_schema_str=schema_str, encryption_secret="123")
+        self.assertEqual(
+            expected_jsons, anonymizer.anonymize_many_str(iter(test_json_strs))
+        )
+        self.assertEqual(
+            [anonymizer.anonymize_json_str(s) for s in test_json_strs],
+            anonymizer.anonymize_many(json.loads(s) for s in test_json_strs),
+        )
+        self.assertEqual([], anonymizer.anonymize_many([]))
+
+    def test_invalid_regex_instantiation_fail(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "values": {
+              "type": "string",
+              "x-anonymize-operation": "apply_function_on_field_in_json_string",
+              "x-anonymize-args": [{
+                "target_field": "content_type",
+                "function": "replace_regex_matches_with_string",
+                "function_args": ["group_[0-9", "group"]
+              }]
+            }
+          }
+        }
+        """
+        with self.assertRaises(InitializationException) as context:
+            Anonymizer(json_schema_str=schema_str)
+        self.assertIn("values", str(context.exception))
+        self.assertIn("group_[0-9", str(context.exception))
+
+    def test_invalid_conditional_args_instantiation_fail(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "user": {
+              "type": "object",
+              "x-anonymize-operation": "conditional_operation",
+              "x-anonymize-args": [{
+                "function": "encrypt",
+                "target_field": "id",
+                "conditional_operators": ["==", "!="],
+                "conditional_fields": "type",
+                "conditional_field_values_when_null": null,
+                "conditional_values": "user"
+              }]
+            }
+          }
+        }
+        """
+        with self.assertRaises(InitializationException) as context:
+            Anonymizer(json_schema_str=schema_str)
+        self.assertIn("user", str(context.exception))
+
+    def test_anonymize_json_bytes(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "user": {
+              "type": "object",
+              "properties": {
+                "id": {
+                  "type": "string",
+                  "x-anonymize-operation": "encrypt"
+                },
+                "name": {
+                  "type": "string",
+                  "x-anonymize-operation": "put_to_null"
+                }
+              }
+            }
+          }
+        }
+        """
+        payload = '{"user": {"id": "1234567", "name": "Jürgen"}, "type": "user"}'
+        expected_json = {
+            "user": {"id": "Zh7hpRitlY7ANahH3RDk7w==", "name": None},
+            "type": "user",
+        }
+        for json_backend in ("json", None):
+            anonymizer = Anonymizer(
+                json_schema_str=schema_str,
+                encryption_secret="123",
+                json_backend=json_backend,
+            )
+            encoded_payload = payload.encode("utf-8")
+            for target in (
+                encoded_payload,
+                bytearray(encoded_payload),
+                memoryview(encoded_payload),
+            ):
+                anonymized = anonymizer.anonymize_json_bytes(target)
+                self.assertIsInstance(anonymized, bytes)
+                self.assertEqual(expected_json, json.loads(anonymized))
+            anonymized = anonymizer.anonymize_json_str_to_str(payload)
+            self.assertIsInstance(anonymized, str)
+            self.assertEqual(expected_json, json.loads(anonymized))
+
+    def test_anonymize_json_bytes_without_fields_to_anonymize(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "user": {
+              "type": "object",
+              "properties": {
+                "name": {
+                  "type": "string",
+                  "x-anonymize-operation": "put_to_null"
+                }
+              }
+            }
+          }
+        }
+        """
+        anonymizer = Anonymizer(json_schema_str=schema_str)
+        # no "user" key: the payload is returned without being parsed
+        payload = b'{"type": "page_view",  "page": "/users"}'
+        self.assertIs(payload, anonymizer.anonymize_json_bytes(payload))
+        # memoryviews are always parsed, they can not be searched without being copied
+        self.assertEqual(
+            json.loads(payload),
+            json.loads(anonymizer.anonymize_json_bytes(memoryview(payload))),
+        )
+        self.assertEqual(
+            payload.decode(), anonymizer.anonymize_json_str_to_str(payload.decode())
+        )
+        # the key may be escaped
+        self.assertEqual(
+            {"user": {"name": None}},
+            json.loads(
+                anonymizer.anonymize_json_bytes(b'{"\\u0075ser": {"name": "x"}}')
+            ),
+        )
+        # the key may be a value only
+        self.assertEqual(
+            {"type": "user"},
+            json.loads(anonymizer.anonymize_json_bytes(b'{"type": "user"}')),
+        )
+        # payloads not encoded in UTF-8 are always parsed
+        for encoding in ("utf-16", "utf-16-le", "utf-16-be", "utf-32", "utf-32-le"):
+            self.assertEqual(
+                {"user": {"name": None}},
+                json.loads(
+                    anonymizer.anonymize_json_bytes(
+                        '{"user": {"name": "x"}}'.encode(encoding)
+                    )
+                ),
+            )
+        self.assertEqual(
+            {"user": {"name": None}},
+            json.loads(
+                anonymizer.anonymize_json_bytes(
+                    '{"user": {"name": "x"}}'.encode("utf-8-sig")
+                )
+            ),
+        )
+
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "array",
+          "items": {
+            "type": "string",
+            "x-anonymize-operation": "put_to_null"
+          }
+        }
+        """
+        anonymizer = Anonymizer(json_schema_str=schema_str)
+        self.assertEqual(
+            [None], json.loads(anonymizer.anonymize_json_bytes(b'["name"]'))
+        )
+
+    def test_nested_arrays_function_application(self):
+        schema_str = """
+        {
+          "$schema": "http://json-schema.org/draft-04/schema#",
+          "type": "object",
+          "properties": {
+            "laps": {
+              "type": "array",
+              "items": {
+                "type": "object",
+                "properties": {
+                  "points": {
+                    "type": "array",
+                    "items": {
+                      "type": "object",
+                      "properties": {
+                        "lat": {
+                          "type": "number",
+                          "x-anonymize-operation": "round_float",
+                          "x-anonymize-args": [1]
+                        }
+                      }
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+        """
+        target_json = {
+            "laps": [
+                {"points": [{"lat": 47.2346}, {"lat": None}, {}, None]},
+                {"points": []},
+                {"points": None},
+                {},
+                None,
+                {"points": [{"lat": 12.3456, "lng": 15.3456}]},
+            ]
+        }
+        expected_json = {
+            "laps": [
+                {"points": [{"lat": 47.2}, {"lat": None}, {}, None]},
+                {"points": []},
+                {"points": None},
+                {},
+                None,
+                {"points": [{"lat": 12.3, "lng": 15.3456}]},
+            ]
+        }
+        anonymizer = Anonymizer(json_schema_str=schema_str)
+        self.assertEqual(expected_json, anonymizer.anonymize_json(target_json))
+
+    def test_reload(self):
+        anonymizer = Anonymizer(
+            json_schema={
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "x-anonymize-operation": "put_to_null"}
+                },
+            },
+            instrumentation=True,
+        )
+        execution_plan = anonymizer.execution_plan
+        anonymizer.reload(
+            json_schema_str='{"type": "object", "properties": {"name": {"type": "string", "x-anonymize-operation": "put_to_null"}}}'
+        )
+        self.assertIsNot(execution_plan, anonymizer.execution_plan)
+        self.assertEqual(
+            {"id": "1", "name": None},
+            anonymizer.anonymize_json({"id": "1", "name": "x"}),
+        )
+        self.assertEqual(
+            '{"id":"1"}', anonymizer.anonymize_json_str_to_str('{"id":"1"}')
+        )
+        self.assertEqual(
+            ["name"],
+            [rule["path"] for rule in anonymizer.statistics_snapshot()["rules"]],
+        )
+        # an invalid json-schema keeps the previous one
+        with self.assertRaises(InitializationException):
+            anonymizer.reload(
+                json_schema={"properties": {"id": {"x-anonymize-operation": "unknown"}}}
+            )
+        self.assertEqual(
+            {"id": "1", "name": None},
+            anonymizer.anonymize_json({"id": "1", "name": "x"}),
+        )
+        self.assertEqual(
+            ["name"],
+            [rule["path"] for rule in anonymizer.statistics_snapshot()["rules"]],
+        )
+        # as well as a json-schema string that is not JSON
+        with self.assertRaises(InitializationException):
+            anonymizer.reload(json_schema_str='{"type": "object",')
+        self.assertEqual(
+            {"id": "1", "name": None},
+            anonymizer.anonymize_json({"id": "1", "name": "x"}),
+        )
+        self.assertRaises(
+            InitializationException, Anonymizer, json_schema_str="not json"
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
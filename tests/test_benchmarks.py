@@ -0,0 +1,31 @@
+import json
+import random
+import unittest
+
+from anonymizer import Anonymizer
+from benchmarks.run import ENTRY_POINTS, compare, run_benchmark
+from benchmarks.scenarios import SCENARIOS
+
+
+class BenchmarksTestCase(unittest.TestCase):
+    def test_scenarios_anonymize_records(self):
+        for scenario, (json_schema, generate) in SCENARIOS.items():
+            with self.subTest(scenario=scenario):
+                anonymizer = Anonymizer(
+                    json_schema=json_schema, encryption_secret="123"
+                )
+                target_json = generate(random.Random(0))
+                anonymized_json = anonymizer.anonymize_json_str(json.dumps(target_json))
+                self.assertNotEqual(target_json, anonymized_json)
+
+    def test_run_benchmark(self):
+        result = run_benchmark("user", ENTRY_POINTS[0], 10, 0)
+        self.assertEqual(10, result["records"])
+        self.assertGreater(result["records_per_second"], 0)
+        self.assertLessEqual(result["p50_us"], result["p99_us"])
+        self.assertGreater(result["peak_memory_bytes"], 0)
+        self.assertEqual(1, len(compare({"results": [result]}, {"results": [result]})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import importlib.util
+import math
+import unittest
+
+from anonymizer import Anonymizer
+from anonymizer.codec import JSON_BACKENDS, default_json_backend, get_codec
+from anonymizer.exceptions import InitializationException
+
+INSTALLED_JSON_BACKENDS = [
+    backend
+    for backend in JSON_BACKENDS
+    if backend == "json" or importlib.util.find_spec(backend) is not None
+]
+
+SCHEMA_STR = """
+{
+  "$schema": "http://json-schema.org/draft-04/schema#",
+  "type": "object",
+  "properties": {
+    "lat": {
+      "type": "number",
+      "x-anonymize-operation": "round_float",
+      "x-anonymize-args": [1]
+    },
+    "content": {
+      "type": "string",
+      "x-anonymize-operation": "apply_function_on_field_in_json_string",
+      "x-anonymize-args": [{"target_field": "id", "function": "put_to_null"}]
+    }
+  }
+}
+"""
+
+
+class JsonCodecTestCase(unittest.TestCase):
+    def test_default_json_backend(self):
+        self.assertEqual(INSTALLED_JSON_BACKENDS[0], default_json_backend())
+        self.assertIs(get_codec(INSTALLED_JSON_BACKENDS[0]), get_codec())
+
+    def test_unknown_json_backend(self):
+        self.assertRaises(ValueError, get_codec, "simplejson")
+        self.assertRaises(
+            InitializationException,
+            Anonymizer,
+            json_schema_str=SCHEMA_STR,
+            json_backend="simplejson",
+        )
+
+    def test_codecs(self):
+        for backend in INSTALLED_JSON_BACKENDS:
+            with self.subTest(backend=backend):
+                json_codec = get_codec(backend)
+                payload = '{"name": "M\\u00fcller", "tags": [1, 2.5, null, true]}'
+                expected = {"name": "Müller", "tags": [1, 2.5, None, True]}
+                self.assertEqual(expected, json_codec.loads(payload))
+                self.assertEqual(expected, json_codec.loads(payload.encode()))
+                self.assertEqual(
+                    expected, json_codec.loads(memoryview(payload.encode()))
+                )
+                self.assertEqual(expected, json_codec.loads(json_codec.dumps(expected)))
+                self.assertEqual(
+                    expected, json_codec.loads(json_codec.dumps_str(expected))
+                )
+                # inputs rejected by the fast backends are handled by the json module
+                self.assertEqual(
+                    {"id": 2**70}, json_codec.loads(json_codec.dumps({"id": 2**70}))
+                )
+                self.assertEqual(
+                    {"1": "a"}, json_codec.loads(json_codec.dumps({1: "a"}))
+                )
+                self.assertRaises(ValueError, json_codec.loads, b'{"a": }')
+
+    def test_codecs_non_finite_floats(self):
+        payload = '{"a": NaN, "b": [Infinity, -Infinity], "c": null}'
+        for backend in INSTALLED_JSON_BACKENDS:
+            with self.subTest(backend=backend):
+                json_codec = get_codec(backend)
+                json_obj = json_codec.loads(payload.encode())
+                self.assertTrue(math.isnan(json_obj["a"]))
+                self.assertEqual([math.inf, -math.inf], json_obj["b"])
+                # written as the json module writes them, not as null
+                self.assertEqual(payload.encode(), json_codec.dumps(json_obj))
+                self.assertEqual(payload, json_codec.dumps_str(json_obj))
+                anonymizer = Anonymizer(
+                    json_schema_str=SCHEMA_STR, json_backend=backend
+                )
+                json_obj = json_codec.loads(
+                    anonymizer.anonymize_json_bytes(b'{"lat": 1.26, "b": NaN}')
+                )
+                self.assertEqual(1.3, json_obj["lat"])
+                self.assertTrue(math.isnan(json_obj["b"]))
+
+    def test_anonymize_json_str_backends(self):
+        target_json_str = (
+            '{"lat": 47.2346, "content": "{\\"id\\": \\"123\\", \\"v\\": 1}"}'
+        )
+        for backend in INSTALLED_JSON_BACKENDS:
+            with self.subTest(backend=backend):
+                anonymizer = Anonymizer(
+                    json_schema_str=SCHEMA_STR, json_backend=backend
+                )
+                self.assertEqual(backend, anonymizer.json_codec.name)
+                # the embedded JSON string keeps the format of the json module
+                self.assertEqual(
+                    {"lat": 47.2, "content": '{"id": null, "v": 1}'},
+                    anonymizer.anonymize_json_str(target_json_str),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+
+from anonymizer.date_patterns import DatePattern, DateStrMemo, compile_date_pattern
+from anonymizer.operators import AnonymizationOperators
+
+PATTERNS = (
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%d/%m/%Y",
+    "{%Y}.%m.%d",
+)
+
+DATE_STRS = (
+    "2020-05-17",
+    "2020-5-7",
+    "2020-05- 7",
+    "2020-02-29",
+    "2019-02-29",
+    "1900-02-29",
+    "0000-01-01",
+    "0999-12-31",
+    "2020-13-01",
+    "2020-04-31",
+    "2020-05-17T10:11:12",
+    "2020-05-17t10:11:12z",
+    "2020-05-17T23:59:60Z",
+    "2020-05-17T24:00:00",
+    "2020-05-17 10:11:12.5",
+    "2020-05-17 \t 10:11:12.123456",
+    "2020-05-17 10:11:12.1234567",
+    "2020-05-17 ",
+    "17/05/2020",
+    "{2020}.05.17",
+    "٢٠٢٠-05-17",
+    "20200517",
+    "",
+    " ",
+    None,
+    20200517,
+)
+
+
+class DatePatternTestCase(unittest.TestCase):
+    def test_same_as_strptime(self):
+        anonymization_operators = AnonymizationOperators()
+        for pattern in PATTERNS:
+            date_pattern = compile_date_pattern(pattern)
+            self.assertIsInstance(date_pattern, DatePattern)
+            for date_str in DATE_STRS:
+                with self.subTest(pattern=pattern, date_str=date_str):
+                    self.assertEqual(
+                        anonymization_operators.truncate_day_from_str(
+                            date_str, pattern
+                        ),
+                        date_pattern.truncate_day(date_str),
+                    )
+
+    def test_truncate_day(self):
+        date_pattern = compile_date_pattern("%Y-%m-%dT%H:%M:%S.%fZ")
+        self.assertEqual(
+            "0987-06-01T00:00:00.000000Z",
+            date_pattern.truncate_day("0987-6-15t10:11:12.1z"),
+        )
+        self.assertEqual(
+            "input_does_not_match_pattern: %Y-%m-%dT%H:%M:%S.%fZ",
+            date_pattern.truncate_day("2020-06-15T10:11:12Z"),
+        )
+        self.assertEqual("%Y-%m-%dT%H:%M:%S.%fZ", str(date_pattern))
+
+    def test_not_compiled_patterns(self):
+        for pattern in (
+            "%y-%m-%d",
+            "%Y-%m",
+            "%Y-%m-%d %I",
+            "%Y-%m-%d%",
+            "%d%m%Y%d",
+            "%%Y-%m-%d",
+            None,
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertIsNone(compile_date_pattern(pattern))
+
+    def test_compile_args(self):
+        anonymization_operators = AnonymizationOperators(date_str_cache_size=0)
+        args = anonymization_operators.compile_args(
+            "truncate_day_from_str", ["%Y-%m-%d"]
+        )
+        self.assertIsInstance(args[0], DatePattern)
+        self.assertEqual(
+            "2020-05-01",
+            anonymization_operators.truncate_day_from_str("2020-05-17", *args),
+        )
+        self.assertEqual(
+            ["%d %b %Y"],
+            anonymization_operators.compile_args("truncate_day_from_str", ["%d %b %Y"]),
+        )
+
+
+class DateStrMemoTestCase(unittest.TestCase):
+    def test_cached_results(self):
+        anonymization_operators = AnonymizationOperators(date_str_cache_size=2)
+        for pattern in ("%Y-%m-%d", "%d %b %Y"):
+            date_str_memo = anonymization_operators.compile_args(
+                "truncate_day_from_str", [pattern]
+            )[0]
+            self.assertIsInstance(date_str_memo, DateStrMemo)
+            # the fields with the same pattern share the cache
+            self.assertIs(
+                date_str_memo,
+                anonymization_operators.compile_args(
+                    "truncate_day_from_str", [pattern]
+                )[0],
+            )
+        date_str_memo = anonymization_operators.compile_args(
+            "truncate_day_from_str", ["%d %b %Y"]
+        )[0]
+        for date_str in ("17 May 2020", "17 May 2020", "17/05/2020", "17/05/2020"):
+            self.assertEqual(
+                anonymization_operators.truncate_day_from_str(date_str, "%d %b %Y"),
+                anonymization_operators.truncate_day_from_str(date_str, date_str_memo),
+            )
+        self.assertEqual(
+            "input_does_not_match_pattern: %d %b %Y",
+            date_str_memo.truncate_day("17/05/2020"),
+        )
+        self.assertIsNone(date_str_memo.truncate_day(None))
+        self.assertIsNone(date_str_memo.truncate_day(["17 May 2020"]))
+        self.assertEqual(
+            {"hits": 3, "misses": 2, "size": 2, "cached": 2}, date_str_memo.info()
+        )
+        date_str_memo.reset_counters()
+        date_str_memo.truncate_day("17 May 2020")
+        self.assertEqual(
+            {"hits": 1, "misses": 0, "size": 2, "cached": 2}, date_str_memo.info()
+        )
+        self.assertEqual(
+            {
+                "truncate_day_from_posix_timestamp",
+                "truncate_day_from_epoch_milliseconds",
+                "truncate_day_from_str:%Y-%m-%d",
+                "truncate_day_from_str:%d %b %Y",
+            },
+            set(anonymization_operators.operator_cache_info()),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from anonymizer.domains import TestDomains
+from anonymizer.operators import AnonymizationOperators
+
+
+class TestDomainsTestCase(unittest.TestCase):
+    def test_exact_domains(self):
+        test_domains = TestDomains([" Example.COM ", "test.com", "test.com"])
+        self.assertEqual(frozenset({"example.com", "test.com"}), test_domains.domains)
+        self.assertIn("example.com", test_domains)
+        self.assertNotIn("qa.example.com", test_domains)
+        self.assertNotIn("com", test_domains)
+        self.assertRaises(ValueError, TestDomains, ["example.com", None])
+
+    def test_subdomains(self):
+        test_domains = TestDomains(["example.com", "qa.runtastic.com"], True)
+        self.assertIn("example.com", test_domains)
+        self.assertIn("qa.example.com", test_domains)
+        self.assertIn("a.b.qa.runtastic.com", test_domains)
+        self.assertNotIn("runtastic.com", test_domains)
+        self.assertNotIn("notexample.com", test_domains)
+        self.assertNotIn("example.com.evil.org", test_domains)
+        self.assertNotIn("", test_domains)
+
+    def test_compile_args(self):
+        anonymization_operators = AnonymizationOperators()
+        args = anonymization_operators.compile_args(
+            "is_email_present_or_test", [["Testing.com"], True]
+        )
+        self.assertIsInstance(args[0], TestDomains)
+        for field_value, expected in (
+            ("a@testing.com", "test"),
+            ("a@QA.Testing.com ", "test"),
+            ("a@gmail.com", "true"),
+            ("a@b@testing.com", "true"),
+            ("a", "invalid"),
+            (" ", "false"),
+            (None, "false"),
+        ):
+            with self.subTest(field_value=field_value):
+                self.assertEqual(
+                    expected,
+                    anonymization_operators.is_email_present_or_test(
+                        field_value, *args
+                    ),
+                )
+        self.assertEqual(
+            "test",
+            anonymization_operators.is_email_present_or_test(
+                "a@qa.testing.com", ["testing.com"], True
+            ),
+        )
+        self.assertEqual(
+            "true",
+            anonymization_operators.is_email_present_or_test(
+                "a@qa.testing.com", ["testing.com"]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
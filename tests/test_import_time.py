@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import unittest
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must be imported only by the operators needing them
+LAZY_MODULES = ("Crypto", "anonymizer.encryption", "datetime", "glom", "numpy")
+
+SCHEMA_STR = """
+{
+  "$schema": "http://json-schema.org/draft-04/schema#",
+  "type": "object",
+  "properties": {
+    "lat": {
+      "type": "number",
+      "x-anonymize-operation": "round_float",
+      "x-anonymize-args": [1]
+    }
+  }
+}
+"""
+
+
+def import_times(code):
+    """
+    Run :code in a new interpreter with -X importtime.
+
+    :return: dictionary with the cumulative import time in microseconds of each imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPOSITORY_PATH,
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def lazy_modules_imported(times):
+    return sorted(
+        module
+        for module in times
+        if any(
+            module == lazy_module or module.startswith(lazy_module + ".")
+            for lazy_module in LAZY_MODULES
+        )
+    )
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_import_does_not_load_lazy_modules(self):
+        times = import_times("import anonymizer")
+        self.assertIn("anonymizer", times)
+        self.assertEqual([], lazy_modules_imported(times))
+
+    def test_schema_without_encryption_does_not_load_lazy_modules(self):
+        # the fast JSON backends have imports of their own (e.g. orjson imports datetime)
+        times = import_times(
+            "from anonymizer import Anonymizer\n"
+            "Anonymizer(json_schema_str={!r}, json_backend='json').anonymize_json_str("
+            "'{{\"lat\": 1.23}}')".format(SCHEMA_STR)
+        )
+        self.assertEqual([], lazy_modules_imported(times))
+
+    def test_encryption_secret_loads_encryption(self):
+        times = import_times(
+            "from anonymizer import Anonymizer\n"
+            "Anonymizer(json_schema_str={!r}, encryption_secret='123')".format(
+                SCHEMA_STR
+            )
+        )
+        self.assertIn("anonymizer.encryption", times)
+
+
+if __name__ == "__main__":
+    unittest.main()
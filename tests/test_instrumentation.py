@@ -0,0 +1,180 @@
+import json
+import unittest
+
+from anonymizer import Anonymizer
+from anonymizer.plan import ExecutionPlan
+
+SCHEMA_STR = """
+{
+  "$schema": "http://json-schema.org/draft-04/schema#",
+  "type": "object",
+  "properties": {
+    "id": {
+      "type": "string",
+      "x-anonymize-operation": "encrypt"
+    },
+    "points": {
+      "type": "array",
+      "items": {
+        "type": "object",
+        "properties": {
+          "lat": {
+            "type": "number",
+            "x-anonymize-operation": "round_float",
+            "x-anonymize-args": [1]
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+TARGET_JSONS = [
+    {"id": "1234567", "points": [{"lat": 47.2346}, {"lat": None}]},
+    {"id": None},
+    {"type": "pass-through"},
+]
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_disabled(self):
+        anonymizer = Anonymizer(json_schema_str=SCHEMA_STR, encryption_secret="123")
+        self.assertIs(ExecutionPlan, type(anonymizer.execution_plan))
+        self.assertIsNone(anonymizer.statistics_snapshot())
+
+    def test_statistics_snapshot(self):
+        hook_calls = []
+        anonymizer = Anonymizer(
+            json_schema_str=SCHEMA_STR,
+            encryption_secret="123",
+            instrumentation_hook=hook_calls.append,
+        )
+        for target_json in TARGET_JSONS:
+            anonymizer.anonymize_json_bytes(json.dumps(target_json).encode())
+        anonymizer.anonymize_many_str(
+            json.dumps(target_json) for target_json in TARGET_JSONS
+        )
+        self.assertEqual(
+            {
+                "id": "Zh7hpRitlY7ANahH3RDk7w==",
+                "points": [{"lat": 47.2}, {"lat": None}],
+            },
+            anonymizer.anonymize_json_str(json.dumps(TARGET_JSONS[0])),
+        )
+
+        snapshot = anonymizer.statistics_snapshot()
+        # the pass-through payload is not parsed by anonymize_json_bytes
+        self.assertEqual(6, snapshot["records"])
+        self.assertEqual(4, len(hook_calls))
+        self.assertEqual(
+            [1, 1, 3, 1], [hook_call["records"] for hook_call in hook_calls]
+        )
+        for key in ("parse_seconds", "traverse_seconds", "serialize_seconds"):
+            self.assertAlmostEqual(
+                snapshot[key], sum(hook_call[key] for hook_call in hook_calls)
+            )
+        self.assertGreater(hook_calls[0]["serialize_seconds"], 0)
+        self.assertEqual(0, hook_calls[2]["serialize_seconds"])
+
+        rules = {rule["path"]: rule for rule in snapshot["rules"]}
+        self.assertEqual({"id", "points/[*]/lat"}, set(rules))
+        self.assertEqual("encrypt", rules["id"]["operation"])
+        # encrypt is anonymized with its batch variant by anonymize_many_str
+        self.assertEqual(5, rules["id"]["count"])
+        self.assertEqual(2, rules["id"]["null_count"])
+        self.assertEqual(1, rules["id"]["skip_count"])
+        self.assertEqual(6, rules["points/[*]/lat"]["count"])
+        self.assertEqual(3, rules["points/[*]/lat"]["null_count"])
+        self.assertEqual(3, rules["points/[*]/lat"]["skip_count"])
+        for rule in rules.values():
+            self.assertGreater(rule["total_seconds"], 0)
+            self.assertGreaterEqual(rule["total_seconds"], rule["max_seconds"])
+
+        anonymizer.statistics.reset()
+        snapshot = anonymizer.statistics_snapshot()
+        self.assertEqual(0, snapshot["records"])
+        self.assertEqual(0, snapshot["rules"][0]["count"])
+
+    def test_operator_caches(self):
+        anonymizer = Anonymizer(
+            json_schema={
+                "type": "object",
+                "properties": {
+                    "created_at": {
+                        "type": "integer",
+                        "x-anonymize-operation": "truncate_day_from_epoch_milliseconds",
+                    }
+                },
+            },
+            instrumentation=True,
+        )
+        self.assertEqual(
+            [{"created_at": 1588291200000}] * 2 + [{"created_at": 1590969600000}],
+            anonymizer.anonymize_many(
+                [
+                    {"created_at": 1588381200000},
+                    {"created_at": 1588381260000},
+                    {"created_at": 1590969600001},
+                ]
+            ),
+        )
+        self.assertEqual(
+            {"created_at": 1588291200000},
+            anonymizer.anonymize_json({"created_at": 1588467600000}),
+        )
+        self.assertEqual(
+            {"hits": 1, "misses": 3, "size": 4, "cached": 2},
+            anonymizer.statistics_snapshot()["operator_caches"][
+                "truncate_day_from_epoch_milliseconds"
+            ],
+        )
+        anonymizer.statistics.reset()
+        self.assertEqual(
+            {"hits": 0, "misses": 0, "size": 4, "cached": 2},
+            anonymizer.statistics_snapshot()["operator_caches"][
+                "truncate_day_from_epoch_milliseconds"
+            ],
+        )
+
+    def test_operator_caches_date_str(self):
+        anonymizer = Anonymizer(
+            json_schema={
+                "type": "object",
+                "properties": {
+                    "birthday": {
+                        "type": "string",
+                        "x-anonymize-operation": "truncate_day_from_str",
+                        "x-anonymize-args": ["%Y-%m-%d"],
+                    }
+                },
+            },
+            instrumentation=True,
+        )
+        self.assertEqual(
+            [{"birthday": "1990-05-01"}] * 2 + [{"birthday": "1985-12-01"}],
+            anonymizer.anonymize_many(
+                [
+                    {"birthday": "1990-05-17"},
+                    {"birthday": "1990-05-17"},
+                    {"birthday": "1985-12-24"},
+                ]
+            ),
+        )
+        self.assertEqual(
+            {"hits": 1, "misses": 2, "size": 4096, "cached": 2},
+            anonymizer.statistics_snapshot()["operator_caches"][
+                "truncate_day_from_str:%Y-%m-%d"
+            ],
+        )
+        anonymizer.statistics.reset()
+        self.assertEqual(
+            {"hits": 0, "misses": 0, "size": 4096, "cached": 2},
+            anonymizer.statistics_snapshot()["operator_caches"][
+                "truncate_day_from_str:%Y-%m-%d"
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
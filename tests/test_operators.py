@@ -1,3 +1,4 @@
+import re
 import unittest
 from anonymizer import AnonymizationOperators
 
@@ -649,6 +650,211 @@ class AnonymizationOperatorsTestCase(unittest.TestCase):
             3, AnonymizationOperators("123").convert_to_field_length([1, 2, 3])
         )
 
+    def test_encrypt_many(self):
+        self.assertEqual(
+            ["KfrlmeI/MCzm5GUeRFz0ag==", None, "Zh7hpRitlY7ANahH3RDk7w=="],
+            AnonymizationOperators("123").encrypt_many(["test", None, 1234567]),
+        )
+        self.assertEqual([None], AnonymizationOperators(None).encrypt_many([None]))
+        self.assertRaises(
+            Exception, AnonymizationOperators(None).encrypt_many, [None, "test"]
+        )
+
+    def test_truncate_day_many(self):
+        anonymization_operators = AnonymizationOperators(None)
+        self.assertEqual(
+            [1588291200, None, -147398400],
+            anonymization_operators.truncate_day_from_posix_timestamp_many(
+                [1588381200, "12345", -146485758]
+            ),
+        )
+        self.assertEqual(
+            [1588291200000, None, -147398400000],
+            anonymization_operators.truncate_day_from_epoch_milliseconds_many(
+                [1588381200000, None, -146534400000]
+            ),
+        )
+
+    def test_encryption_decryption_round_trip(self):
+        anonymization_operators = AnonymizationOperators("123")
+        encrypted = anonymization_operators.encrypt("test")
+        self.assertEqual("test", anonymization_operators.decrypt(encrypted))
+        # the cipher is reused: encrypting after decrypting gives the same output
+        self.assertEqual(encrypted, anonymization_operators.encrypt("test"))
+        self.assertEqual(
+            "a longer value, spanning more than one block",
+            anonymization_operators.decrypt(
+                anonymization_operators.encrypt(
+                    "a longer value, spanning more than one block"
+                )
+            ),
+        )
+
+    def test_encryption_many(self):
+        anonymization_operators = AnonymizationOperators("123")
+        values = ["test", None, 1234567, "", "äöü €", "a value longer than one block"]
+        encrypted = anonymization_operators.encrypt_many(values)
+        self.assertEqual(
+            [anonymization_operators.encrypt(value) for value in values], encrypted
+        )
+        self.assertEqual(
+            [None if value is None else str(value) for value in values],
+            anonymization_operators.decrypt_many(encrypted),
+        )
+        self.assertEqual([], anonymization_operators.encrypt_many([]))
+
+    def test_encryption_cache(self):
+        self.assertIsNone(AnonymizationOperators("123").encryption_cache_info())
+        anonymization_operators = AnonymizationOperators("123", encryption_cache_size=2)
+        self.assertEqual(
+            "KfrlmeI/MCzm5GUeRFz0ag==", anonymization_operators.encrypt("test")
+        )
+        self.assertEqual(
+            "KfrlmeI/MCzm5GUeRFz0ag==", anonymization_operators.encrypt("test")
+        )
+        self.assertEqual(
+            ["Zh7hpRitlY7ANahH3RDk7w==", None, "KfrlmeI/MCzm5GUeRFz0ag=="],
+            anonymization_operators.encrypt_many([1234567, None, "test"]),
+        )
+        self.assertEqual(
+            "test", anonymization_operators.decrypt("KfrlmeI/MCzm5GUeRFz0ag==")
+        )
+        cache_info = anonymization_operators.encryption_cache_info()
+        self.assertEqual(2, cache_info["encrypt"].hits)
+        self.assertEqual(2, cache_info["encrypt"].misses)
+        self.assertEqual(2, cache_info["encrypt"].currsize)
+        self.assertEqual(1, cache_info["decrypt"].misses)
+
+    def test_compile_args(self):
+        anonymization_operators = AnonymizationOperators(None)
+        guid_pattern = "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+        args = anonymization_operators.compile_args(
+            "replace_regex_matches_with_string", [guid_pattern, "anonymized"]
+        )
+        self.assertEqual(re.compile(guid_pattern), args[0])
+        self.assertEqual(
+            "https://www.testing.com/ru/user/anonymized/dashboard",
+            anonymization_operators.replace_regex_matches_with_string(
+                "https://www.testing.com/ru/user/5894e20e-a7af-471e-bf3f-042cd81b8ac6/dashboard",
+                *args
+            ),
+        )
+
+        schema_args = [
+            {
+                "separator": ";",
+                "function": "replace_regex_matches_with_string",
+                "function_args": ["[0-9]+", "x"],
+            }
+        ]
+        args = anonymization_operators.compile_args(
+            "split_anonymize_and_join", schema_args
+        )
+        self.assertEqual(re.compile("[0-9]+"), args[0]["function_args"][0])
+        # the args of the json-schema are not modified
+        self.assertEqual("[0-9]+", schema_args[0]["function_args"][0])
+        self.assertEqual(
+            "ax;b;x",
+            anonymization_operators.split_anonymize_and_join("a1; b; 23", *args),
+        )
+
+        self.assertEqual([2], anonymization_operators.compile_args("round_float", [2]))
+        self.assertRaises(
+            ValueError,
+            anonymization_operators.compile_args,
+            "replace_regex_matches_with_string",
+            ["(", "x"],
+        )
+
+    def test_compile_conditional_args(self):
+        anonymization_operators = AnonymizationOperators("123")
+        (conditional_operations,) = anonymization_operators.compile_args(
+            "conditional_operation",
+            [
+                {
+                    "function": "replace_regex_matches_with_string",
+                    "function_args": ["[0-9]+", "x"],
+                    "target_field": "attributes.name",
+                    "conditional_operators": ["==", "<"],
+                    "conditional_fields": ["type", "attributes.member_count"],
+                    "conditional_field_values_when_null": [None, 0],
+                    "conditional_values": ["group", 100],
+                }
+            ],
+        )
+        self.assertEqual("type", conditional_operations[0].conditions[0].path.field)
+        self.assertEqual(
+            re.compile("[0-9]+"), conditional_operations[0].function_args[0]
+        )
+        self.assertEqual(
+            {"type": "group", "attributes": {"name": "group x", "member_count": None}},
+            anonymization_operators.conditional_operation(
+                {
+                    "type": "group",
+                    "attributes": {"name": "group 12", "member_count": None},
+                },
+                conditional_operations,
+            ),
+        )
+        self.assertRaises(
+            ValueError,
+            anonymization_operators.compile_args,
+            "conditional_operation",
+            [
+                {
+                    "function": "encrypt",
+                    "target_field": "id",
+                    "conditional_operators": "~",
+                    "conditional_fields": "type",
+                    "conditional_field_values_when_null": None,
+                    "conditional_values": "user",
+                }
+            ],
+        )
+
+    def test_conditional_anonymizer_missing_paths(self):
+        conditional_args = {
+            "function": "encrypt",
+            "target_field": "attributes.source_content.id",
+            "conditional_operators": "==",
+            "conditional_fields": "images.0.type",
+            "conditional_field_values_when_null": None,
+            "conditional_values": "user",
+        }
+        anonymization_operators = AnonymizationOperators("123")
+        # the operation is skipped if the target field does not exist
+        for field_dict in (
+            {"attributes": {}},
+            {"attributes": {"source_content": None}},
+            {"attributes": []},
+        ):
+            self.assertEqual(
+                field_dict,
+                anonymization_operators.conditional_operation(
+                    dict(field_dict), conditional_args
+                ),
+            )
+        self.assertEqual(
+            {
+                "attributes": {"source_content": {"id": "Zh7hpRitlY7ANahH3RDk7w=="}},
+                "images": [{"type": "user"}],
+            },
+            anonymization_operators.conditional_operation(
+                {
+                    "attributes": {"source_content": {"id": "1234567"}},
+                    "images": [{"type": "user"}],
+                },
+                conditional_args,
+            ),
+        )
+        # a missing conditional field raises an error
+        self.assertRaises(
+            KeyError,
+            anonymization_operators.conditional_operation,
+            {"attributes": {"source_content": {"id": "1234567"}}, "images": []},
+            conditional_args,
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from anonymizer import Anonymizer, InitializationException
+from anonymizer.exceptions import RecordException, WorkerException
+from anonymizer import parallel
+from anonymizer.parallel import ParallelAnonymizer
+from anonymizer.stream import StreamStatistics
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "properties": {
+        "id": {"type": "string", "x-anonymize-operation": "encrypt"},
+        "index": {"type": "integer"},
+    },
+}
+
+DATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "birthday": {
+            "type": "string",
+            "x-anonymize-operation": "truncate_day_from_str",
+            "x-anonymize-args": ["%Y-%m-%d"],
+        }
+    },
+}
+
+
+def _worker_operator_cache_info():
+    return parallel._worker_anonymizer.anonymization_operators.operator_cache_info()
+
+
+def _stop_worker(chunk_id, chunk):
+    os._exit(1)
+
+
+class ParallelAnonymizerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            json.dumps({"id": str(i), "index": i}).encode("utf-8") + b"\n"
+            for i in range(50)
+        ]
+        anonymizer = Anonymizer(json_schema=SCHEMA, encryption_secret="123")
+        self.expected_records = [
+            anonymizer.anonymize_json_str(line) for line in self.lines
+        ]
+
+    def test_ordered(self):
+        statistics = StreamStatistics()
+        with ParallelAnonymizer(
+            json_schema=SCHEMA, encryption_secret="123", workers=2, chunk_size=7
+        ) as parallel_anonymizer:
+            chunks = list(
+                parallel_anonymizer.anonymize_ndjson(
+                    iter(self.lines), statistics=statistics
+                )
+            )
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(self.expected_records, records)
+        self.assertEqual(50, statistics.records_read)
+        self.assertEqual(50, statistics.records_written)
+
+    def test_unordered(self):
+        with ParallelAnonymizer(
+            json_schema=SCHEMA,
+            encryption_secret="123",
+            workers=2,
+            chunk_size=3,
+            ordered=False,
+        ) as parallel_anonymizer:
+            chunks = list(parallel_anonymizer.anonymize_ndjson(self.lines))
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(
+            self.expected_records, sorted(records, key=lambda r: r["index"])
+        )
+
+    def test_error_policies(self):
+        lines = self.lines[:3] + [b"not json\n"] + self.lines[3:5]
+        dead_letter_file = io.BytesIO()
+        with ParallelAnonymizer(
+            json_schema=SCHEMA, encryption_secret="123", workers=2, chunk_size=2
+        ) as parallel_anonymizer:
+            chunks = list(
+                parallel_anonymizer.anonymize_ndjson(
+                    lines, on_error="dead-letter", dead_letter_file=dead_letter_file
+                )
+            )
+            self.assertEqual(5, len(b"".join(chunks).splitlines()))
+            self.assertEqual(b"not json\n", dead_letter_file.getvalue())
+
+            with self.assertRaises(RecordException) as context:
+                list(parallel_anonymizer.anonymize_ndjson(lines))
+            self.assertEqual(4, context.exception.line_number)
+
+    def test_date_str_cache_size(self):
+        for date_str_cache_size, expected_size in ((16, 16), (0, None)):
+            with self.subTest(date_str_cache_size=date_str_cache_size):
+                with ParallelAnonymizer(
+                    json_schema=DATE_SCHEMA,
+                    workers=1,
+                    date_str_cache_size=date_str_cache_size,
+                ) as parallel_anonymizer:
+                    operator_cache_info = parallel_anonymizer._executor.submit(
+                        _worker_operator_cache_info
+                    ).result()
+                self.assertEqual(
+                    expected_size,
+                    operator_cache_info.get("truncate_day_from_str:%Y-%m-%d", {}).get(
+                        "size"
+                    ),
+                )
+
+    def test_worker_stopped(self):
+        # the worker process stops while anonymizing a chunk, whose result never comes
+        with mock.patch.object(parallel, "_anonymize_chunk", _stop_worker):
+            with self.assertRaises(WorkerException):
+                with ParallelAnonymizer(
+                    json_schema=SCHEMA, workers=2, chunk_size=7
+                ) as parallel_anonymizer:
+                    list(parallel_anonymizer.anonymize_ndjson(self.lines))
+
+    def test_invalid_schema(self):
+        self.assertRaises(
+            InitializationException,
+            ParallelAnonymizer,
+            json_schema={"properties": {"id": {"x-anonymize-operation": "unknown"}}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
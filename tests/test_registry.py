@@ -0,0 +1,176 @@
+import json
+import os
+import tempfile
+import unittest
+
+from anonymizer.exceptions import InitializationException
+from anonymizer.registry import (
+    AnonymizerRegistry,
+    SchemaDirectoryWatcher,
+    schema_content_hash,
+)
+
+USER_SCHEMA_STR = """
+{
+  "type": "object",
+  "properties": {
+    "id": {"type": "string", "x-anonymize-operation": "encrypt"}
+  }
+}
+"""
+
+# same content as USER_SCHEMA_STR, formatted differently
+USER_SCHEMA = {
+    "properties": {"id": {"x-anonymize-operation": "encrypt", "type": "string"}},
+    "type": "object",
+}
+
+GROUP_SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string", "x-anonymize-operation": "put_to_null"}},
+}
+
+
+class AnonymizerRegistryTestCase(unittest.TestCase):
+    def test_lazy_compilation_shared_by_content(self):
+        registry = AnonymizerRegistry(encryption_secret="123")
+        self.assertEqual(
+            registry.register("user", json_schema_str=USER_SCHEMA_STR),
+            registry.register("user_created", json_schema=USER_SCHEMA, version=2),
+        )
+        self.assertEqual(
+            schema_content_hash(USER_SCHEMA),
+            registry.register("group", json_schema=USER_SCHEMA),
+        )
+        registry.register("group", json_schema=GROUP_SCHEMA, version=2)
+        self.assertEqual(0, registry.cache_info()["compiled"])
+        self.assertIn("user", registry)
+        self.assertEqual(4, len(registry))
+
+        self.assertIs(registry.get("user"), registry.get("user_created"))
+        self.assertEqual(
+            {"id": "Zh7hpRitlY7ANahH3RDk7w=="},
+            registry.anonymize_json("user_created", {"id": "1234567"}, version=2),
+        )
+        # the last registered version is used by default
+        self.assertEqual(
+            {"name": None}, registry.anonymize_json("group", {"name": "x"})
+        )
+        self.assertEqual(
+            {"hits": 2, "misses": 2, "max_size": 256, "compiled": 2, "registered": 4},
+            registry.cache_info(),
+        )
+
+    def test_lru_eviction(self):
+        registry = AnonymizerRegistry(max_size=1)
+        registry.register("user", json_schema=USER_SCHEMA)
+        registry.register("group", json_schema=GROUP_SCHEMA)
+        user_anonymizer = registry.get("user")
+        registry.get("group")
+        self.assertEqual(1, registry.cache_info()["compiled"])
+        self.assertIsNot(user_anonymizer, registry.get("user"))
+        self.assertEqual(3, registry.cache_info()["misses"])
+
+    def test_unknown_and_invalid_schemas(self):
+        registry = AnonymizerRegistry()
+        self.assertRaises(KeyError, registry.get, "user")
+        registry.register("user", json_schema=USER_SCHEMA)
+        self.assertRaises(KeyError, registry.get, "user", version=3)
+        registry.unregister("user")
+        self.assertNotIn("user", registry)
+        self.assertRaises(KeyError, registry.get, "user")
+
+        registry.register(
+            "invalid",
+            json_schema={"properties": {"id": {"x-anonymize-operation": "unknown"}}},
+        )
+        self.assertRaises(InitializationException, registry.get, "invalid")
+        self.assertRaises(InitializationException, registry.register, "empty")
+        self.assertRaises(ValueError, AnonymizerRegistry, max_size=0)
+
+    def test_precompile_swaps_compiled_schema(self):
+        registry = AnonymizerRegistry(encryption_secret="123")
+        registry.register("user", json_schema=USER_SCHEMA, precompile=True)
+        self.assertEqual(1, registry.cache_info()["compiled"])
+        user_anonymizer = registry.get("user")
+
+        registry.register("user", json_schema=GROUP_SCHEMA, precompile=True)
+        # the Anonymizer in use keeps the previous json-schema
+        self.assertEqual(
+            {"id": "Zh7hpRitlY7ANahH3RDk7w=="},
+            user_anonymizer.anonymize_json({"id": "1234567"}),
+        )
+        self.assertEqual({"name": None}, registry.anonymize_json("user", {"name": "x"}))
+        self.assertEqual(
+            {"hits": 2, "misses": 2, "max_size": 256, "compiled": 1, "registered": 1},
+            registry.cache_info(),
+        )
+
+        # an invalid json-schema does not replace the registered one
+        self.assertRaises(
+            InitializationException,
+            registry.register,
+            "user",
+            json_schema={"properties": {"id": {"x-anonymize-operation": "unknown"}}},
+            precompile=True,
+        )
+        self.assertEqual({"name": None}, registry.anonymize_json("user", {"name": "x"}))
+
+
+class SchemaDirectoryWatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.registry = AnonymizerRegistry(encryption_secret="123")
+        self.watcher = SchemaDirectoryWatcher(self.registry, self.directory.name)
+
+    def write_schema(self, file_name, content):
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, "w") as schema_file:
+            schema_file.write(content)
+        # a different mtime, even on file systems with a coarse resolution
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_poll(self):
+        self.write_schema("user.json", USER_SCHEMA_STR)
+        self.write_schema("group.json", json.dumps(GROUP_SCHEMA))
+        self.write_schema("notes.txt", "not a json-schema")
+        self.assertEqual(["group", "user"], self.watcher.poll())
+        self.assertEqual(2, self.registry.cache_info()["compiled"])
+        self.assertEqual([], self.watcher.poll())
+
+        self.write_schema("user.json", json.dumps(GROUP_SCHEMA))
+        self.assertEqual(["user"], self.watcher.poll())
+        self.assertEqual(
+            {"name": None}, self.registry.anonymize_json("user", {"name": "x"})
+        )
+
+        with self.assertLogs("anonymizer.registry", level="ERROR"):
+            self.write_schema("user.json", "{invalid json")
+            self.assertEqual([], self.watcher.poll())
+        self.assertEqual(
+            {"name": None}, self.registry.anonymize_json("user", {"name": "x"})
+        )
+
+        os.remove(os.path.join(self.directory.name, "group.json"))
+        self.assertEqual(["group"], self.watcher.poll())
+        self.assertNotIn("group", self.registry)
+        self.assertIn("user", self.registry)
+
+    def test_start_and_stop(self):
+        self.write_schema("user.json", USER_SCHEMA_STR)
+        with SchemaDirectoryWatcher(
+            self.registry, self.directory.name, poll_interval=0.01
+        ) as watcher:
+            # the directory is polled once before start returns
+            self.assertIn("user", self.registry)
+            self.assertRaises(RuntimeError, watcher.start)
+        watcher.stop()
+        self.assertRaises(
+            ValueError, SchemaDirectoryWatcher, self.registry, ".", poll_interval=0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
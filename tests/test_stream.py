@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from anonymizer import Anonymizer
+from anonymizer.__main__ import main
+from anonymizer.exceptions import RecordException
+from anonymizer.stream import StreamStatistics, anonymize_ndjson
+
+SCHEMA_STR = """
+{
+  "$schema": "http://json-schema.org/draft-04/schema#",
+  "type": "object",
+  "properties": {
+    "id": {
+      "type": "string",
+      "x-anonymize-operation": "encrypt"
+    },
+    "lat": {
+      "type": "number",
+      "x-anonymize-operation": "round_float",
+      "x-anonymize-args": [1]
+    }
+  }
+}
+"""
+
+INPUT_LINES = [
+    b'{"id": "1234567", "lat": 47.2346}\n',
+    b"\n",
+    b'{"id": null, "lat": "not a float"}\n',
+    b"not json\n",
+    b'{"lat": 1.26}\n',
+]
+
+
+class StreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.anonymizer = Anonymizer(
+            json_schema_str=SCHEMA_STR, encryption_secret="123"
+        )
+
+    def test_anonymize_ndjson_skip(self):
+        statistics = StreamStatistics()
+        output_lines = list(
+            anonymize_ndjson(
+                self.anonymizer,
+                iter(INPUT_LINES),
+                batch_size=2,
+                on_error="skip",
+                statistics=statistics,
+            )
+        )
+        self.assertEqual(
+            [
+                {"id": "Zh7hpRitlY7ANahH3RDk7w==", "lat": 47.2},
+                {"lat": 1.3},
+            ],
+            [json.loads(line) for line in output_lines],
+        )
+        self.assertTrue(all(line.endswith(b"\n") for line in output_lines))
+        self.assertEqual(4, statistics.records_read)
+        self.assertEqual(2, statistics.records_written)
+        self.assertEqual(2, statistics.records_failed)
+
+    def test_anonymize_ndjson_dead_letter(self):
+        dead_letter_file = io.BytesIO()
+        output_lines = list(
+            anonymize_ndjson(
+                self.anonymizer,
+                INPUT_LINES,
+                on_error="dead-letter",
+                dead_letter_file=dead_letter_file,
+            )
+        )
+        self.assertEqual(2, len(output_lines))
+        self.assertEqual(
+            b'{"id": null, "lat": "not a float"}\nnot json\n',
+            dead_letter_file.getvalue(),
+        )
+
+    def test_anonymize_ndjson_fail(self):
+        with self.assertRaises(RecordException) as context:
+            list(anonymize_ndjson(self.anonymizer, INPUT_LINES))
+        self.assertEqual(3, context.exception.line_number)
+
+    def test_anonymize_ndjson_invalid_arguments(self):
+        self.assertRaises(
+            ValueError, list, anonymize_ndjson(self.anonymizer, [], on_error="ignore")
+        )
+        self.assertRaises(
+            ValueError,
+            list,
+            anonymize_ndjson(self.anonymizer, [], on_error="dead-letter"),
+        )
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_path = os.path.join(tmp_dir, "schema.json")
+            input_path = os.path.join(tmp_dir, "input.ndjson")
+            output_path = os.path.join(tmp_dir, "output.ndjson")
+            dead_letter_path = os.path.join(tmp_dir, "dead_letter.ndjson")
+            with open(schema_path, "w") as f:
+                f.write(SCHEMA_STR)
+            with open(input_path, "wb") as f:
+                f.writelines(INPUT_LINES)
+
+            exit_code = main(
+                [
+                    schema_path,
+                    "--input",
+                    input_path,
+                    "--output",
+                    output_path,
+                    "--encryption-secret",
+                    "123",
+                    "--on-error",
+                    "dead-letter",
+                    "--dead-letter-file",
+                    dead_letter_path,
+                ]
+            )
+
+            self.assertEqual(0, exit_code)
+            with open(output_path, "rb") as f:
+                self.assertEqual(
+                    [
+                        {"id": "Zh7hpRitlY7ANahH3RDk7w==", "lat": 47.2},
+                        {"lat": 1.3},
+                    ],
+                    [json.loads(line) for line in f],
+                )
+            with open(dead_letter_path, "rb") as f:
+                self.assertEqual(2, len(f.readlines()))
+
+            self.assertEqual(
+                1, main([schema_path, "--input", input_path, "--output", output_path])
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import datetime
+import random
+import unittest
+
+from anonymizer import timestamps
+from anonymizer.timestamps import (
+    MAX_POSIX_TIMESTAMP,
+    MonthBucketCache,
+    MIN_POSIX_TIMESTAMP,
+    NUMPY_MIN_BATCH_SIZE,
+    civil_from_days,
+    days_from_civil,
+    posix_seconds,
+    posix_seconds_from_milliseconds,
+    truncate_to_month,
+    truncate_to_month_many,
+)
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def datetime_truncate_to_month(posix_timestamp):
+    """Reference implementation, with datetime."""
+    try:
+        date = EPOCH + datetime.timedelta(seconds=posix_timestamp)
+    except OverflowError:
+        return None
+    return int(
+        (
+            date.replace(day=1, hour=0, minute=0, second=0, microsecond=0) - EPOCH
+        ).total_seconds()
+    )
+
+
+class TimestampsTestCase(unittest.TestCase):
+    def test_civil_days_round_trip(self):
+        for days in range(-719162, 2932897, 997):
+            date = datetime.date(1970, 1, 1) + datetime.timedelta(days=days)
+            self.assertEqual((date.year, date.month, date.day), civil_from_days(days))
+            self.assertEqual(days, days_from_civil(date.year, date.month, date.day))
+
+    def test_truncate_to_month(self):
+        rng = random.Random(42)
+        posix_timestamps = [
+            MIN_POSIX_TIMESTAMP,
+            MAX_POSIX_TIMESTAMP,
+            -1,
+            0,
+            951782400,
+            951868799,
+        ] + [
+            rng.randint(MIN_POSIX_TIMESTAMP, MAX_POSIX_TIMESTAMP) for _ in range(10000)
+        ]
+        for posix_timestamp in posix_timestamps:
+            self.assertEqual(
+                datetime_truncate_to_month(posix_timestamp),
+                truncate_to_month(posix_timestamp),
+            )
+        self.assertEqual(
+            [truncate_to_month(posix_timestamp) for posix_timestamp in posix_timestamps]
+            + [None],
+            truncate_to_month_many(posix_timestamps + [None]),
+        )
+
+    @unittest.skipUnless(timestamps._import_numpy(), "numpy is not installed")
+    def test_truncate_to_month_many_numpy(self):
+        posix_timestamps = list(
+            range(MIN_POSIX_TIMESTAMP, MAX_POSIX_TIMESTAMP, 7919 * 86400 + 1)
+        )
+        self.assertGreater(len(posix_timestamps), NUMPY_MIN_BATCH_SIZE)
+        self.assertEqual(
+            [None]
+            + [
+                truncate_to_month(posix_timestamp)
+                for posix_timestamp in posix_timestamps
+            ],
+            truncate_to_month_many([None] + posix_timestamps),
+        )
+
+    def test_posix_seconds(self):
+        # floats are rounded to the microsecond, like datetime.datetime.fromtimestamp
+        self.assertEqual(1, posix_seconds(0.9999996))
+        self.assertEqual(0, posix_seconds(0.9999994))
+        self.assertEqual(-1, posix_seconds(-0.5))
+        self.assertEqual(0, posix_seconds(-0.0000004))
+        self.assertEqual(1, posix_seconds(True))
+        self.assertEqual(MAX_POSIX_TIMESTAMP, posix_seconds(float(MAX_POSIX_TIMESTAMP)))
+        self.assertIsNone(posix_seconds(MAX_POSIX_TIMESTAMP + 1.0))
+        self.assertIsNone(posix_seconds(MIN_POSIX_TIMESTAMP - 1))
+        self.assertIsNone(posix_seconds(float("nan")))
+        self.assertIsNone(posix_seconds(float("inf")))
+        self.assertIsNone(posix_seconds("12345"))
+
+        self.assertEqual(-2, posix_seconds_from_milliseconds(-1001))
+        self.assertEqual(-1, posix_seconds_from_milliseconds(-1000.0))
+        self.assertEqual(
+            MAX_POSIX_TIMESTAMP,
+            posix_seconds_from_milliseconds(MAX_POSIX_TIMESTAMP * 1000 + 999),
+        )
+        self.assertIsNone(posix_seconds_from_milliseconds(10**400))
+        self.assertIsNone(posix_seconds_from_milliseconds(None))
+
+
+class MonthBucketCacheTestCase(unittest.TestCase):
+    def test_buckets(self):
+        cache = MonthBucketCache(scale=1000, size=2)
+        self.assertIsNone(cache.get(1588381200000))
+        # 2020-05-01, 2020-02-01 (leap year) and 2020-12-01
+        self.assertEqual(1588291200000, cache.add(1588291200))
+        self.assertEqual(1580515200000, cache.add(1580515200))
+        self.assertEqual(1588291200000, cache.get(1588381200000))
+        self.assertEqual(1588291200000, cache.get(1588291200000))
+        self.assertIsNone(cache.get(1590969600000))
+        self.assertEqual(1580515200000, cache.get(1582934400000))
+        self.assertIsNone(cache.get(1583020800000))
+        cache.add(1606780800)
+        # the least recently used month is dropped
+        self.assertIsNone(cache.get(1588291200000))
+        self.assertEqual(1606780800000, cache.get(1609459199999))
+        self.assertEqual({"hits": 4, "misses": 4, "size": 2, "cached": 2}, cache.info())
+        cache.reset_counters()
+        self.assertEqual({"hits": 0, "misses": 0, "size": 2, "cached": 2}, cache.info())
+        self.assertRaises(ValueError, MonthBucketCache, size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()